@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# coding:utf-8
+"""
+shared helpers for the standalone benchmarks.
+
+run them from the project root against a migrated database, e.g.
+
+    python benchmarks/due_query.py --rows 1000000
+
+DJANGO_SETTINGS_MODULE defaults to `schediumdev.settings`.
+"""
+import os
+import sys
+import time
+import uuid
+import contextlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django():
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "schediumdev.settings")
+
+    import django
+    django.setup()
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextlib.contextmanager
+def rollback():
+    """run the block in a transaction that is always rolled back."""
+    from django.db import transaction
+
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback()
+    except _Rollback:
+        pass
+
+
+@contextlib.contextmanager
+def timer(results, name):
+    start = time.perf_counter()
+    yield
+    results[name] = time.perf_counter() - start
+
+
+def seed_tasks(rows, finished_ratio=0.0, spread=3600, batch_size=10000, task_type="bench"):
+    """bulk insert `rows` delay tasks due within `spread` seconds."""
+    from schedium import models
+
+    now = time.time()
+    finished = int(rows * finished_ratio)
+    for offset in range(0, rows, batch_size):
+        models.SchediumTask.objects.bulk_create([
+            models.SchediumTask(
+                sched_id=uuid.uuid4().hex, task_type=task_type, task_id=str(index),
+                start_time=now, next_time=now + (index * spread / rows),
+                is_finished=index < finished, updated_time=now,
+            )
+            for index in range(offset, min(offset + batch_size, rows))
+        ], batch_size=batch_size)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# coding:utf-8
+"""
+throughput of `Schedium.delay_task` called per row against the bulk
+`Schedium.delay_tasks`.
+"""
+import argparse
+
+from _common import setup_django, timer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=50000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    from schedium import models
+    from schedium.core import schediumer
+
+    # far in the future so that nothing is claimed or fired meanwhile.
+    specs = [{"task_type": "bench", "task_id": str(index), "delay": 24 * 3600}
+             for index in range(args.tasks)]
+
+    # both run in autocommit, as in production, and are cleaned up after.
+    results = {}
+    try:
+        with timer(results, "delay_task"):
+            for spec in specs:
+                schediumer.delay_task(**spec)
+        models.SchediumTask.objects.filter(task_type="bench").delete()
+
+        with timer(results, "delay_tasks"):
+            schediumer.delay_tasks(specs, batch_size=args.batch_size)
+    finally:
+        models.SchediumTask.objects.filter(task_type="bench").delete()
+
+    for name, elapsed in results.items():
+        print("{:<12} {:>10.0f} tasks/s ({:.3f}s)".format(name, args.tasks / elapsed, elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# coding:utf-8
+"""
+query plan and latency of the due-task query with and without the
+partial `schedium_due_idx` index, on a table made mostly of finished rows.
+"""
+import argparse
+import time
+
+from _common import setup_django, rollback, seed_tasks, timer
+
+
+def due_queryset(now, lookahead):
+    from schedium import models
+
+    # the unclaimed rows query of `Schedium.safe_fetch_tasks`, its filter
+    # has to imply the `schedium_due_idx` condition for the index to be used.
+    return models.SchediumTask.objects.filter(
+        next_time__lte=now + lookahead, is_finished=False, is_paused=False, in_sched=False,
+    )
+
+
+def measure(label, repeat, lookahead):
+    now = time.time()
+    queryset = due_queryset(now, lookahead)
+    print("== {}".format(label))
+    print(queryset.explain())
+
+    results = {}
+    with timer(results, "elapsed"):
+        for _ in range(repeat):
+            list(queryset.values_list("sched_id", flat=True))
+    print("{:.3f} ms / query\n".format(results["elapsed"] * 1000 / repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--finished-ratio", type=float, default=0.99)
+    parser.add_argument("--lookahead", type=float, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from schedium import models
+
+    index = next(index for index in models.SchediumTask._meta.indexes
+                 if index.name == "schedium_due_idx")
+
+    # everything, including the dropped index, is rolled back at the end.
+    # sqlite can only alter the schema in a transaction without fk checks.
+    connection.disable_constraint_checking()
+    with rollback():
+        seed_tasks(args.rows, finished_ratio=args.finished_ratio)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE {}".format(models.SchediumTask._meta.db_table))
+
+        measure("with schedium_due_idx", args.repeat, args.lookahead)
+
+        with connection.schema_editor(atomic=False) as schema_editor:
+            schema_editor.remove_index(models.SchediumTask, index)
+        measure("without schedium_due_idx", args.repeat, args.lookahead)
+    connection.enable_constraint_checking()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# coding:utf-8
+"""
+submission latency (submit -> start of execution) and throughput of
+`schedium.pool.Pool`, against the former design where every task hopped
+through a dispatcher thread, and `concurrent.futures.ThreadPoolExecutor`.
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Empty
+from threading import Thread
+
+from _common import setup_django
+
+
+def make_dispatcher_pool(size):
+    from schedium.pool import Pool, _Task
+
+    class DispatcherPool(Pool):
+        # the former submission path: execute -> dispatcher queue ->
+        # pool-main thread (1s poll) -> task queue -> labor.
+        def start(self):
+            super().start()
+            self._dispatcher_queue = Queue()
+            self.mainthread = Thread(name="pool-main", target=self._main, daemon=True)
+            self.mainthread.start()
+
+        def _main(self):
+            while self._working:
+                try:
+                    _ret = self._dispatcher_queue.get(timeout=1)
+                    if isinstance(_ret, _Task):
+                        self.task_queue.put(_ret, block=False)
+                except Empty:
+                    pass
+
+        def execute(self, func, args=(), kwargs={}, id=None):
+            _t = _Task(func, args, kwargs, id)
+            self._dispatcher_queue.put(_t)
+            return _t.future
+
+        def stop(self, cancel_pending=True, wait=True):
+            pending = super().stop(cancel_pending=cancel_pending, wait=wait)
+            self.mainthread.join()
+            return pending
+
+    pool = DispatcherPool(size)
+    pool.start()
+    return pool
+
+
+def make_pool(size):
+    from schedium.pool import Pool
+
+    pool = Pool(size)
+    pool.start()
+    return pool
+
+
+def started_at(submitted):
+    return time.perf_counter() - submitted
+
+
+def measure(name, executor, tasks):
+    # latency: one task at a time on an idle executor.
+    latencies = [executor.submit(started_at, time.perf_counter()).result()
+                 for _ in range(min(tasks, 2000))]
+
+    start = time.perf_counter()
+    futures = [executor.submit(int) for _ in range(tasks)]
+    [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+    executor.shutdown()
+
+    print("{:<20} p50 {:>8.1f}us  p99 {:>8.1f}us  {:>9.0f} tasks/s".format(
+        name,
+        statistics.median(latencies) * 1e6,
+        statistics.quantiles(latencies, n=100)[98] * 1e6,
+        tasks / elapsed,
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--size", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    measure("Pool", make_pool(args.size), args.tasks)
+    measure("dispatcher Pool", make_dispatcher_pool(args.size), args.tasks)
+    measure("ThreadPoolExecutor", ThreadPoolExecutor(args.size), args.tasks)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# coding:utf-8
+"""
+scheduling benchmark suite, prints (or writes) JSON results.
+
+for every size in --sizes it measures on the configured database:
+
+- create:     bulk and per-row task creation throughput.
+- claim:      `safe_fetch_tasks` cost for a window holding every task.
+- complete:   batched completion writes (`safe_handle_executed_tasks`).
+- memory:     traced bytes per in-memory task in the timer queue.
+- fire:       firing lag percentiles of --fire-tasks tasks shared by
+              1..N scheduler instances (--instances).
+
+e.g. python benchmarks/suite.py --sizes 1000 100000 --instances 1 4 -o results.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import threading
+import time
+import tracemalloc
+
+from _common import setup_django, timer
+
+TASK_TYPE = "bench-suite"
+
+
+def cleanup():
+    from schedium import models
+
+    models.SchediumTask.objects.filter(task_type=TASK_TYPE).delete()
+
+
+def specs(count, delay):
+    return ({"task_type": TASK_TYPE, "task_id": str(index), "delay": delay}
+            for index in range(count))
+
+
+def percentiles(values):
+    values = sorted(values)
+    if not values:
+        return {}
+
+    def at(fraction):
+        return values[min(int(len(values) * fraction), len(values) - 1)]
+
+    return {
+        "p50": at(0.50), "p90": at(0.90), "p99": at(0.99), "max": values[-1],
+        "mean": statistics.mean(values),
+    }
+
+
+def bench_create(size, per_row_limit):
+    from schedium.core import Schedium
+
+    node = Schedium(autostart=False)
+    results, timings = {}, {}
+
+    with timer(timings, "bulk"):
+        node.delay_tasks(specs(size, 3600), batch_size=1000)
+    cleanup()
+    results["bulk_per_s"] = size / timings["bulk"]
+
+    per_row = min(size, per_row_limit)
+    with timer(timings, "per_row"):
+        for spec in specs(per_row, 3600):
+            node.delay_task(**spec)
+    cleanup()
+    results["per_row_per_s"] = per_row / timings["per_row"]
+
+    return results
+
+
+def bench_claim_and_complete(size):
+    from schedium.core import Schedium
+
+    node = Schedium(autostart=False, completion_batch_size=1000)
+    node.delay_tasks(specs(size, 0), batch_size=1000)
+
+    timings = {}
+    with timer(timings, "claim"):
+        tasks = node.safe_fetch_tasks()
+
+    executed = {task.sched_id: time.time() for task in tasks}
+    with timer(timings, "complete"):
+        for offset in range(0, len(tasks), node.completion_batch_size):
+            batch = tasks[offset:offset + node.completion_batch_size]
+            node.safe_handle_executed_tasks({task.sched_id: executed[task.sched_id] for task in batch})
+    cleanup()
+
+    return {
+        "claimed": len(tasks),
+        "claim_seconds": timings["claim"],
+        "claim_per_s": len(tasks) / timings["claim"],
+        "complete_per_s": len(tasks) / timings["complete"],
+    }
+
+
+def bench_memory(size):
+    from schedium import models
+    from schedium.timerqueue import TimerQueue
+
+    now = time.time()
+    gc.collect()
+    tracemalloc.start()
+    queue = TimerQueue(
+        models.SchediumTaskNamedTuple(
+            sched_id="{:032x}".format(index), task_type=TASK_TYPE, task_id=str(index),
+            start_time=now, next_time=now + index, end_time=now + index, interval=None,
+            last_executed_time=None, is_finished=False, in_sched=True,
+        )
+        for index in range(size)
+    )
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(queue) == size
+    return {"bytes_per_task": current / size}
+
+
+def bench_fire(tasks, instances, spread, event_driven):
+    from schedium.core import Schedium
+
+    lags = []
+    lock = threading.Lock()
+
+    # the task_id carries the due time, the lag is measured in the callback.
+    def callback(task_id):
+        lag = time.time() - float(task_id)
+        with lock:
+            lags.append(lag)
+
+    nodes = [Schedium(event_driven=event_driven, pool_size=8, autostart=False)
+             for _ in range(instances)]
+    for node in nodes:
+        node.register(TASK_TYPE, callback)
+
+    now = time.time() + 1
+    nodes[0]._create_tasks(
+        {"sched_id": "{}-{}".format(TASK_TYPE, index), "task_type": TASK_TYPE,
+         "task_id": repr(now + index * spread / tasks), "start_time": now - 1,
+         "end_time": None, "interval": None, "next_time": now + index * spread / tasks}
+        for index in range(tasks)
+    )
+    [node.start() for node in nodes]
+
+    deadline = now + spread + 30
+    while len(lags) < tasks and time.time() < deadline:
+        time.sleep(0.1)
+    [node.shutdown() for node in nodes]
+    cleanup()
+
+    result = {"fired": len(lags), "lag_seconds": percentiles(lags)}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--instances", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--fire-tasks", type=int, default=2000)
+    parser.add_argument("--fire-spread", type=float, default=5,
+                        help="seconds over which the fired tasks are due")
+    parser.add_argument("--per-row-limit", type=int, default=2000,
+                        help="cap of tasks created one by one")
+    parser.add_argument("--polling", action="store_true",
+                        help="fire with the polling tick instead of the event driven one")
+    parser.add_argument("-o", "--output", help="write the JSON results to this file")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from schedium.core import schediumer
+
+    # the default scheduler would compete for the benchmark rows.
+    schediumer.shutdown()
+    cleanup()
+
+    results = {
+        "environment": {
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "started": time.time(),
+        },
+        "sizes": {},
+        "fire": {},
+    }
+
+    for size in args.sizes:
+        results["sizes"][size] = {
+            "create": bench_create(size, args.per_row_limit),
+            "claim_complete": bench_claim_and_complete(size),
+            "memory": bench_memory(size),
+        }
+
+    for instances in args.instances:
+        results["fire"][instances] = bench_fire(
+            args.fire_tasks, instances, args.fire_spread, not args.polling
+        )
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
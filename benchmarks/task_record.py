@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# coding:utf-8
+"""
+build time and memory per in-memory task: the `SchediumTaskNamedTuple`
+records loaded from `values_list` against model instances and, when
+pydantic is installed, the former pydantic model built from `__dict__`.
+"""
+import argparse
+import gc
+import tracemalloc
+import typing
+
+from _common import setup_django, rollback, seed_tasks, timer
+
+
+def measure(name, build, tasks, results):
+    gc.collect()
+    tracemalloc.start()
+    with timer(results, name):
+        records = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(records) == tasks
+    print("{:<16} {:>8.3f}s {:>8.0f} bytes/task".format(name, results[name], current / tasks))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=100000)
+    args = parser.parse_args()
+
+    setup_django()
+    from schedium import models
+
+    fields = models.SchediumTaskNamedTuple._fields
+    builders = {
+        "values_list": lambda: list(map(
+            models.SchediumTaskNamedTuple._make,
+            models.SchediumTask.objects.values_list(*fields)
+        )),
+        "model instances": lambda: list(models.SchediumTask.objects.all()),
+    }
+
+    try:
+        import pydantic
+
+        class PydanticTask(pydantic.BaseModel):
+            sched_id: str
+            task_type: str
+            task_id: str
+            start_time: float
+            next_time: float
+            end_time: typing.Optional[float]
+            interval: typing.Optional[float]
+            last_executed_time: typing.Optional[float]
+            is_finished: bool
+            in_sched: bool
+
+        builders["pydantic"] = lambda: [
+            PydanticTask(**task.__dict__) for task in models.SchediumTask.objects.all()
+        ]
+    except ImportError:
+        pass
+
+    results = {}
+    with rollback():
+        seed_tasks(args.tasks)
+        for name, build in builders.items():
+            measure(name, build, args.tasks, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# coding:utf-8
+"""
+in-memory scheduling structures of `Schedium` with N near-term tasks:
+the timing wheel (`timer="wheel"`), the heap (`timer="heap"`) and the
+former plain list scanned on every tick.
+
+for each size it measures push and remove (cancel) cost per task, the
+expiry cost per task while the clock moves through the schedule with one
+`peek_time` + `pop_due` per tick, and traced bytes per task.
+
+e.g. python benchmarks/timers.py --sizes 10000 100000 1000000
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from collections import namedtuple
+
+from _common import setup_django
+
+Task = namedtuple("Task", ["sched_id", "next_time"])
+
+
+class ListTimer(object):
+    """the former `self._tasks`: a list scanned on every tick."""
+
+    def __init__(self):
+        self._tasks = []
+
+    def push(self, task):
+        self._tasks.append(task)
+
+    def remove(self, sched_id):
+        for task in self._tasks:
+            if task.sched_id == sched_id:
+                self._tasks.remove(task)
+                return task
+
+    def peek_time(self):
+        return min((task.next_time for task in self._tasks), default=None)
+
+    def pop_due(self, now):
+        due = [task for task in self._tasks if task.next_time <= now]
+        self._tasks = [task for task in self._tasks if task.next_time > now]
+        return due
+
+
+STRUCTURES = ["wheel", "heap", "list"]
+
+
+def bench(factory, tasks, start, spread, ticks, removals):
+    results = {}
+
+    gc.collect()
+    tracemalloc.start()
+    timer = factory()
+    for task in tasks:
+        timer.push(task)
+    results["bytes_per_task"] = tracemalloc.get_traced_memory()[0] / len(tasks)
+    tracemalloc.stop()
+
+    del timer
+    gc.collect()
+    timer = factory()
+    begin = time.perf_counter()
+    for task in tasks:
+        timer.push(task)
+    results["push_us"] = (time.perf_counter() - begin) / len(tasks) * 1e6
+
+    removed = random.Random(1).sample(tasks, removals)
+    begin = time.perf_counter()
+    for task in removed:
+        timer.remove(task.sched_id)
+    results["remove_us"] = (time.perf_counter() - begin) / removals * 1e6
+
+    fired = 0
+    begin = time.perf_counter()
+    for tick in range(1, ticks + 1):
+        timer.peek_time()
+        fired += sum(1 for _ in timer.pop_due(start + spread * tick / ticks))
+    results["expire_us"] = (time.perf_counter() - begin) / max(fired, 1) * 1e6
+    assert fired == len(tasks) - removals
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--spread", type=float, default=600,
+                        help="seconds over which the tasks are due")
+    parser.add_argument("--ticks", type=int, default=60,
+                        help="pop_due calls while going through the spread")
+    parser.add_argument("--remove-ratio", type=float, default=0.01)
+    parser.add_argument("--list-limit", type=int, default=100000,
+                        help="largest size run with the list, it is O(n) per tick and per remove")
+    parser.add_argument("--structures", nargs="+", default=STRUCTURES, choices=STRUCTURES)
+    args = parser.parse_args()
+
+    setup_django()
+    from schedium.timerqueue import TimerQueue, TimingWheel
+    factories = {"wheel": TimingWheel, "heap": TimerQueue, "list": ListTimer}
+
+    print("{:>9} {:>6} {:>9} {:>10} {:>10} {:>10}".format(
+        "tasks", "timer", "push us", "remove us", "expire us", "bytes/task"))
+    for size in args.sizes:
+        start = time.time()
+        rnd = random.Random(size)
+        tasks = [Task("{:032x}".format(index), start + rnd.uniform(0, args.spread))
+                 for index in range(size)]
+        removals = max(int(size * args.remove_ratio), 1)
+
+        for name in args.structures:
+            if name == "list" and size > args.list_limit:
+                continue
+            results = bench(factories[name], tasks, start, args.spread, args.ticks, removals)
+            print("{:>9} {:>6} {:>9.2f} {:>10.2f} {:>10.2f} {:>10.0f}".format(
+                size, name, results["push_us"], results["remove_us"],
+                results["expire_us"], results["bytes_per_task"]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# coding:utf-8
+import asyncio
+import logging
+import time
+import traceback
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.db.utils import DatabaseError
+
+from .core import Schedium
+from .pool import _Task, _Result
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSchedium(Schedium):
+    """
+    Schedium whose tick loop runs on an asyncio event loop: `async def`
+    callbacks are awaited on the loop, up to `max_in_flight` at once,
+    instead of occupying a pool thread each. plain callbacks are still
+    dispatched to their executor, and the database work runs through
+    `sync_to_async`.
+
+    `start()` runs the loop in its own thread; to share an existing loop,
+    construct with `autostart=False` and await `run()` in it instead.
+    the tick is always event driven.
+    """
+
+    def __init__(self, *args, max_in_flight=1000, **kwargs):
+        self.max_in_flight = max_in_flight
+        self._loop = None
+        self._wakeup = None
+        self._running = set()
+        self._in_flight = None
+
+        kwargs["event_driven"] = True
+        super().__init__(*args, **kwargs)
+
+    def _tick_loop(self):
+        asyncio.run(self.run())
+        connections.close_all()
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+
+        self._tick_start_event.set()
+        await sync_to_async(self._prepare_tick_loop)()
+
+        while self._tick_start_event.is_set():
+            logger.debug("AsyncSchedium: {} tick: {}".format(self._id, time.time()))
+
+            try:
+                await sync_to_async(self._maintain)()
+            except DatabaseError as e:
+                logger.warning("AsyncSchedium: {} tick is failed: {}, retry {}s later.".format(
+                    self._id, e, self.tick_interval))
+                await sync_to_async(connections.close_all)()
+                await asyncio.sleep(self.tick_interval)
+                continue
+            for task_type, task_id, sched_id in self.fetch_closed_tasks():
+                self._dispatch(task_type, task_id, sched_id)
+
+            self._wakeup.clear()
+            timeout = self._next_tick_timeout()
+            if timeout > 0 and not self._update_in_next_tick.is_set() and \
+                    self._tick_start_event.is_set():
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        self._loop = None
+
+    def _submit(self, task_type, task_id, sched_id):
+        callback = self._callbacks.get(task_type)
+        if self._loop is None or not asyncio.iscoroutinefunction(callback) or \
+                task_type in self._callback_executors:
+            super()._submit(task_type, task_id, sched_id)
+            return
+
+        # also called from pool threads when a deferred task gets its slot.
+        asyncio.run_coroutine_threadsafe(
+            self._execute_async(callback, task_type, task_id, sched_id, self._queue(sched_id)),
+            self._loop
+        )
+
+    async def _execute_async(self, callback, task_type, task_id, sched_id, ticket):
+        self._running.add(asyncio.current_task())
+        _task = _Task(callback, (task_id,), {})
+        started = False
+        try:
+            async with self._in_flight:
+                # False if cancelled, paused or rescheduled while waiting for a slot.
+                started = self._unqueue(sched_id, ticket)
+                if not started:
+                    return
+                start = time.time()
+                result = await callback(task_id)
+            self._record_execution(task_type, False, time.time() - start)
+            self.pool._on_result(_Result(_task, result, None, None, time.time() - start))
+        except Exception as e:
+            logger.warning("exception: {} is occurred".format(e))
+            self._record_execution(task_type, True, time.time() - start)
+            self.pool._on_result(_Result(
+                _task, None, traceback.format_exc(), e, time.time() - start
+            ))
+        finally:
+            if started:
+                await sync_to_async(self._task_done)(task_type, sched_id)
+            else:
+                self._release_slot(task_type)
+            self._running.discard(asyncio.current_task())
+
+    def _free_capacity(self):
+        return super()._free_capacity() + max(self.max_in_flight - len(self._running), 0)
+
+    def update_in_next_tick(self):
+        super().update_in_next_tick()
+
+        loop = self._loop
+        if loop is not None and self._wakeup is not None:
+            try:
+                loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                # the loop is already closed.
+                pass
@@ -5,5 +5,7 @@ class SchediumConfig(AppConfig):
     name = 'schedium'
 
     def ready(self):
-        from .core import schediumer
-        return schediumer
+        from . import conf
+        if conf.get("AUTOSTART"):
+            from .core import start_schediumer
+            start_schediumer()
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+# coding:utf-8
+from django.conf import settings
+
+# SCHEDIUM_<name> settings and their defaults:
+#
+# - AUTOSTART:    start the default scheduler `schediumer` when the app is
+#                 ready. off by default, run `manage.py runschedium` or
+#                 turn it on in the processes which should run tasks.
+# - OPTIONS:      keyword arguments of the default `Schedium`.
+# - TASK_MODULES: modules registering task callbacks, imported before the
+#                 default scheduler is started.
+DEFAULTS = {
+    "AUTOSTART": False,
+    "OPTIONS": {},
+    "TASK_MODULES": (),
+}
+
+
+def get(name):
+    return getattr(settings, "SCHEDIUM_" + name, DEFAULTS[name])
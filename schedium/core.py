@@ -1,30 +1,109 @@
 #!/usr/bin/env python3
 # coding:utf-8
+import asyncio
+import inspect
 import logging
+import sqlite3
 import time
 import datetime
 import typing
 import uuid
-from functools import wraps
-from threading import Thread, Event
+from collections import deque
+from concurrent.futures import Future
+from functools import wraps, partial
+from importlib import import_module
+from threading import Thread, Event, Lock
 
 from django.db import transaction, connections
-from django.db.utils import ProgrammingError
+from django.db.models import Q
+from django.db.utils import DatabaseError, ProgrammingError
+from django.utils.functional import SimpleLazyObject
 
-from schedium import models
+from schedium import conf, models
+from .cron import compile_cron
+from .metrics import Metrics, NullMetrics
+from .misfire import MISFIRE_POLICIES, MISFIRE_SKIP, next_fire_time
+from .notify import send_notify, watcher
 from .pool import Pool
+from .process import ProcessPool
+from .retention import purge_finished_tasks
+from .timerqueue import TimerQueue, TimingWheel
 
 logger = logging.getLogger(__name__)
 
 
 class Schedium(object):
+    # rows changed this many seconds before the last sync are fetched again
+    # by the delta sync, to tolerate clock skew between writers.
+    sync_margin = 2
 
-    def __init__(self, tick_interval=1, id=None, pool_size=5):
+    def __init__(self, tick_interval=1, id=None, pool_size=5, event_driven=False,
+                 full_sync_interval=None, completion_batch_size=100,
+                 completion_flush_interval=None, lease_ttl=None, claim_limit=None,
+                 retention=None, retention_sweep_interval=3600,
+                 result_callback=None, result_queue_size=0,
+                 pool_max_size=None, pool_idle_timeout=60,
+                 executor="thread", process_pool_size=None, process_mp_context=None,
+                 lanes=None, max_backlog=None, metrics=None, metrics_export_interval=60,
+                 notify=False, notify_poll_interval=0.5, timer="heap", timer_resolution=0.1,
+                 autostart=True):
         self._id = id or uuid.uuid4().hex
-        self._tasks = []
+        # in-memory claimed tasks by next_time: a heap by default, or a
+        # hierarchical timing wheel for millions of near-term tasks.
+        if timer == "heap":
+            self._tasks = TimerQueue()
+        elif timer == "wheel":
+            self._tasks = TimingWheel(resolution=timer_resolution)
+        else:
+            raise ValueError("unknown timer: {}".format(timer))
         self._callbacks = {}
 
-        self.pool = Pool(pool_size)
+        # outcomes of `execute_task` (result or exception, duration) and
+        # autoscaling up to `pool_max_size` labors, see Pool.
+        self.pool = Pool(pool_size, result_callback=result_callback,
+                         result_queue_size=result_queue_size,
+                         max_size=pool_max_size, idle_timeout=pool_idle_timeout)
+
+        # named execution backends, `executor` is the default one and can be
+        # overridden per task_type on register. the process pool runs CPU
+        # bound callbacks outside the GIL and is only started when used.
+        self._executors = {
+            "thread": self.pool,
+            "process": ProcessPool(process_pool_size, result_callback=result_callback,
+                                   mp_context=process_mp_context),
+        }
+        self.executor = executor
+        self._callback_executors = {}
+
+        # per task_type dispatch options: a higher priority is picked first
+        # by the pools, tasks over `max_concurrency` wait in memory until a
+        # running one of the same type is done. lanes are dedicated pools.
+        self._priorities = {}
+        self._concurrency_limits = {}
+        self._running_counts = {}
+        self._deferred = {}
+        self._slots_lock = Lock()
+        # tasks submitted to an executor and not started yet, by sched_id:
+        # a cancel, pause or reschedule drops them so that they do not run.
+        self._queued = {}
+        self._submit_lock = Lock()
+        self._draining = False
+        for name, size in (lanes or {}).items():
+            self.add_lane(name, size)
+
+        # backpressure: with `max_backlog` set, a sync claims no more than the
+        # free worker capacity plus `max_backlog`, minus what is already held
+        # in memory; the rest stays in the database for other instances.
+        self.max_backlog = max_backlog
+        self._need_full_sync = False
+
+        # instrumentation: `metrics=True` or a `Metrics` instance turns it on,
+        # exporters of the metrics are called every `metrics_export_interval`.
+        if metrics is True:
+            metrics = Metrics()
+        self.metrics = metrics or NullMetrics()
+        self.metrics_export_interval = metrics_export_interval
+        self._last_export_time = time.time()
 
         # tick
         self.tick_interval = tick_interval
@@ -35,146 +114,561 @@ class Schedium(object):
 
         self._tick_count = 0
 
-        self.start()
+        # event driven: sleep until the earliest known task is due or the
+        # tick is woken by `update_in_next_tick`, instead of polling.
+        self.event_driven = event_driven
+        self._last_sync_time = 0
+
+        # delta sync: between full syncs only rows changed since the last
+        # sync or newly entering the lookahead window are fetched.
+        self.full_sync_interval = full_sync_interval or 60 * tick_interval
+        self._last_full_sync_time = 0
+
+        # executed tasks are buffered and written back in batches, flushed
+        # when the batch is full or on the tick after the flush interval.
+        self.completion_batch_size = completion_batch_size
+        self.completion_flush_interval = completion_flush_interval or tick_interval
+        self._completions = {}
+        self._completions_lock = Lock()
+        self._cancelled = []
+        self._last_flush_time = 0
+
+        # claimed rows are leased to this instance and the lease is renewed
+        # by the tick; rows of a crashed instance are reclaimed on expiry.
+        self.lease_ttl = lease_ttl or 30 * tick_interval
+        self.claim_limit = claim_limit
+        self._last_heartbeat_time = 0
+
+        # optional sweeper deleting finished tasks older than `retention`.
+        self.retention = retention
+        self.retention_sweep_interval = retention_sweep_interval
+        self._sweeper_thread = None
+        self._sweeper_stop_event = Event()
+
+        # cross-process wakeup, see `schedium.notify`: tasks created due
+        # within the sync window wake the nodes of the other processes, by
+        # LISTEN/NOTIFY on Postgres or by polling elsewhere.
+        self.notify = notify
+        self.notify_poll_interval = notify_poll_interval
+        self._watcher = None
+
+        if autostart:
+            self.start()
 
     def start(self):
+        if self.is_running():
+            return
+
+        self._draining = False
         self._tick_thread = Thread(target=self._tick_loop)
         self._tick_thread.daemon = True
         self._tick_thread.start()
 
         self.pool.start()
 
+        if self.notify:
+            self._watcher = watcher(self.update_in_next_tick, 10 * self.tick_interval,
+                                    poll_interval=self.notify_poll_interval)
+            self._watcher.start()
+
+        if self.retention:
+            self._sweeper_stop_event.clear()
+            self._sweeper_thread = Thread(target=self._sweep_loop)
+            self._sweeper_thread.daemon = True
+            self._sweeper_thread.start()
+
+    def _sweep_loop(self):
+        while not self._sweeper_stop_event.wait(self.retention_sweep_interval):
+            try:
+                purged = purge_finished_tasks(self.retention)
+                logger.debug("Schedium: {} purged {} finished tasks".format(self._id, purged))
+            except Exception as e:
+                logger.warning("purging finished tasks failed: {}".format(e))
+
+        connections.close_all()
+
     @transaction.atomic
     def initial_schedium_database(self):
-        models.SchediumTask.objects.select_for_update().filter(
-            next_time__lte=time.time(),
+        # only rows without a live lease, other instances keep their claims.
+        now = time.time()
+        models.SchediumTask.objects.select_for_update(skip_locked=True).filter(
+            Q(lease_expire__isnull=True) | Q(lease_expire__lt=now),
             in_sched=True,
         ).update(
-            in_sched=False
+            in_sched=False, lease_owner=None, lease_expire=None, updated_time=now
         )
 
     def _tick_loop(self):
         if not self._tick_start_event.is_set():
             self._tick_start_event.set()
 
-        while True:
-            try:
-                self.initial_schedium_database()
-                break
-            except ProgrammingError:
-                logger.warning("the initialize-schedium database is failed, retry 2s later.")
-                logger.warning("do u forget to `python manage.py migrate schedium`???")
-                time.sleep(2)
-
-        self._tasks = self.sync_database()
+        self._prepare_tick_loop()
 
         while self._tick_start_event.is_set():
             logger.debug("Schedium: {} tick: {}".format(self._id, time.time()))
 
-            self._tick()
+            try:
+                self._tick()
+            except DatabaseError as e:
+                # e.g. a lost connection or a locked database, the tasks
+                # stay claimed until the next tick.
+                logger.warning("Schedium: {} tick is failed: {}, retry {}s later.".format(
+                    self._id, e, self.tick_interval))
+                connections.close_all()
+                time.sleep(self.tick_interval)
+                continue
+            self._wait_next_tick()
+
+        connections.close_all()
+
+    def _prepare_tick_loop(self):
+        while self._tick_start_event.is_set():
+            try:
+                self.initial_schedium_database()
+                if self._tasks:
+                    self.safe_release_task_bench(self._tasks.sched_ids())
+                    self._tasks.clear()
+                self.sync_database(full=True)
+                break
+            except DatabaseError as e:
+                logger.warning("the initialize-schedium database is failed: {}, retry 2s later.".format(e))
+                if isinstance(e, ProgrammingError):
+                    logger.warning("do u forget to `python manage.py migrate schedium`???")
+                connections.close_all()
+                time.sleep(2)
 
+    def _wait_next_tick(self):
+        if not self.event_driven:
             time.sleep(self.tick_interval)
             self._tick_count += 1
             if self._tick_count >= 60:
                 self._tick_count = 0
+            return
 
-        connections.close_all()
+        timeout = self._next_tick_timeout()
+        # the wakeup of `shutdown` may have been cleared by the last sync.
+        if timeout > 0 and self._tick_start_event.is_set():
+            self._update_in_next_tick.wait(timeout)
 
-    @transaction.atomic
-    def sync_database(self, tasks: typing.List[models.SchediumTaskNamedTuple] = None):
-        sched_ids = [task.sched_id for task in (tasks or self._tasks)]
-        models.SchediumTask.objects.select_for_update().filter(
-            sched_id__in=sched_ids
-        ).update(
-            in_sched=False
-        )
+    def _next_tick_timeout(self):
+        wakeup = self._last_sync_time + 10 * self.tick_interval
+        next_time = self._tasks.peek_time()
+        if next_time is not None:
+            wakeup = min(wakeup, next_time)
+
+        if self._completions:
+            wakeup = min(wakeup, self._last_flush_time + self.completion_flush_interval)
+
+        wakeup = min(wakeup, self._last_heartbeat_time + self.lease_ttl / 3)
+
+        return wakeup - time.time()
+
+    def _need_sync(self):
+        if self._update_in_next_tick.is_set():
+            return True
+
+        if self.event_driven:
+            return time.time() - self._last_sync_time >= 10 * self.tick_interval
+        else:
+            return self._tick_count % 10 == 0
 
+    def sync_database(self, full=False) -> typing.List[models.SchediumTaskNamedTuple]:
+        # tasks already in memory stay claimed, only the new ones are merged.
         now = time.time()
-        queryset = models.SchediumTask.objects.select_for_update().filter(
-            next_time__lte=now + 10 * self.tick_interval, in_sched=False, is_finished=False
-        )
-        tasks = [task.dump_named_tuple() for task in queryset.all()]
-        queryset.update(in_sched=True)
+        limit = self._claim_budget()
+        if limit is not None and limit <= 0:
+            # rows skipped now are not seen by a delta sync later.
+            self._need_full_sync = True
+            self._last_sync_time = now
+            return []
+        if self.claim_limit:
+            limit = min(limit, self.claim_limit) if limit else self.claim_limit
+
+        start = time.perf_counter() if self.metrics.enabled else None
+        full = full or self._need_full_sync or \
+            now - self._last_full_sync_time >= self.full_sync_interval
+        if full:
+            self._last_full_sync_time = now
+            self._reconcile()
+            tasks = self.safe_fetch_tasks(limit=limit)
+        else:
+            self._reconcile(changed_since=self._last_sync_time - self.sync_margin)
+            tasks = self.safe_fetch_tasks(
+                changed_since=self._last_sync_time - self.sync_margin,
+                horizon_since=self._last_sync_time + 10 * self.tick_interval,
+                limit=limit,
+            )
+        self._last_sync_time = now
+        self._need_full_sync = limit is not None and len(tasks) >= limit
+
+        if start is not None:
+            kind = "full" if full else "delta"
+            self.metrics.observe("sync_seconds", time.perf_counter() - start, kind=kind)
+            self.metrics.inc("sync_rows_total", len(tasks), kind=kind)
+
+        for task in tasks:
+            self._tasks.push(task)
 
         return tasks
 
+    def _reconcile(self, changed_since=None):
+        """
+        drop the in-memory tasks whose rows are not leased to this instance
+        any more, e.g. cancelled, paused or rescheduled by another process.
+
+        the delta sync only reads the rows changed since the last sync within
+        the lookahead window, where every in-memory task is, by the indexed
+        `updated_time`. tasks rescheduled past the window by another process
+        are dropped by the next full sync.
+        """
+        if not self._tasks:
+            return
+
+        lost = None
+        if changed_since is not None:
+            changed = list(models.SchediumTask.objects.filter(
+                updated_time__gte=changed_since,
+                next_time__lte=time.time() + 10 * self.tick_interval,
+            ).exclude(lease_owner=self._id).values_list(
+                "sched_id", flat=True
+            )[:len(self._tasks) + 1])
+            if len(changed) <= len(self._tasks):
+                lost = [sched_id for sched_id in changed if sched_id in self._tasks]
+
+        if lost is None:
+            # a full sync, or more changed rows than tasks in memory: look
+            # the in-memory ones up.
+            sched_ids = self._tasks.sched_ids()
+            lost = []
+            for offset in range(0, len(sched_ids), 1000):
+                batch = sched_ids[offset:offset + 1000]
+                if changed_since is not None:
+                    lost.extend(models.SchediumTask.objects.filter(
+                        sched_id__in=batch, updated_time__gte=changed_since
+                    ).exclude(lease_owner=self._id).values_list("sched_id", flat=True))
+                else:
+                    kept = set(models.SchediumTask.objects.filter(
+                        sched_id__in=batch, lease_owner=self._id
+                    ).values_list("sched_id", flat=True))
+                    lost.extend(sched_id for sched_id in batch if sched_id not in kept)
+
+        for sched_id in lost:
+            self._tasks.remove(sched_id)
+
+    def _claim_budget(self):
+        if self.max_backlog is None:
+            return None
+
+        deferred = sum(len(tasks) for tasks in self._deferred.values())
+        return self._free_capacity() + self.max_backlog - len(self._tasks) - deferred
+
+    def _free_capacity(self):
+        free = 0
+        for executor in self._executors.values():
+            if executor is self.pool or executor.is_working():
+                free += executor.free_capacity()
+        return free
+
     def update_in_next_tick(self):
         if not self._update_in_next_tick.is_set():
             self._update_in_next_tick.set()
 
     def _tick(self):
-        if self._tick_count % 10 == 0 or self._update_in_next_tick.is_set():
+        start = time.perf_counter() if self.metrics.enabled else None
+        self._maintain()
+
+        for task_type, task_id, sched_id in self.fetch_closed_tasks():
+            self._dispatch(task_type, task_id, sched_id)
+
+        if start is not None:
+            self.metrics.observe("tick_seconds", time.perf_counter() - start)
+
+    def _maintain(self):
+        if time.time() - self._last_heartbeat_time >= self.lease_ttl / 3:
+            self.renew_leases()
+
+        if self._completions and \
+                time.time() - self._last_flush_time >= self.completion_flush_interval:
+            self.flush_completions()
+
+        if self._need_sync():
             self._update_in_next_tick.clear()
 
-            self._tasks = self.sync_database()
+            self.sync_database()
 
-        for task_type, task_id, sched_id in self.fetch_closed_tasks():
-            self.pool.execute(
-                self.execute_task,
-                kwargs={
-                    "task_type": task_type,
-                    "task_id": task_id,
-                    "sched_id": sched_id
-                }
-            )
+        if self.metrics.exporters and \
+                time.time() - self._last_export_time >= self.metrics_export_interval:
+            self._last_export_time = time.time()
+            self.metrics.export()
 
-    def fetch_closed_tasks(self, tasks=None):
+    def _dispatch(self, task_type, task_id, sched_id):
+        limit = self._concurrency_limits.get(task_type)
+        if limit:
+            with self._slots_lock:
+                if self._running_counts.get(task_type, 0) >= limit:
+                    self._deferred.setdefault(task_type, deque()).append((task_id, sched_id))
+                    return
+                self._running_counts[task_type] = self._running_counts.get(task_type, 0) + 1
+
+        self._submit(task_type, task_id, sched_id)
+
+    def _release_slot(self, task_type):
+        if not self._concurrency_limits.get(task_type):
+            return
+
+        with self._slots_lock:
+            deferred = self._deferred.get(task_type)
+            if not deferred:
+                self._running_counts[task_type] -= 1
+                return
+            # the slot is handed over to the next waiting task.
+            task_id, sched_id = deferred.popleft()
+
+        self._submit(task_type, task_id, sched_id)
+
+    def _submit(self, task_type, task_id, sched_id):
+        # serialized with `shutdown` stopping the executors: a slot handed
+        # over by a labor meanwhile neither restarts them nor gets lost.
+        with self._submit_lock:
+            if self._draining:
+                if self._concurrency_limits.get(task_type):
+                    with self._slots_lock:
+                        self._running_counts[task_type] -= 1
+                # released by `shutdown` with the other unstarted tasks.
+                with self._completions_lock:
+                    self._cancelled.append(sched_id)
+                return
+
+            executor = self._executors[self._callback_executors.get(task_type, self.executor)]
+            if not executor.is_working():
+                executor.start()
+            priority = self._priorities.get(task_type, 0)
+
+            if isinstance(executor, Pool) or task_type not in self._callbacks:
+                executor = executor if isinstance(executor, Pool) else self.pool
+                executor.execute(
+                    self.execute_task,
+                    kwargs={
+                        "task_type": task_type,
+                        "task_id": task_id,
+                        "sched_id": sched_id,
+                        "ticket": self._queue(sched_id),
+                    },
+                    priority=priority
+                )
+                return
+
+            # only the callback crosses the process boundary, the completion is
+            # written back from this process.
+            future = executor.execute(self._callbacks[task_type], (task_id,), priority=priority)
+            self._queue(sched_id, future)
+        # outside the lock, a finished future runs the callback right away.
+        future.add_done_callback(partial(self._finish_remote_task, task_type, sched_id))
+
+    def _queue(self, sched_id, ticket=None):
+        ticket = ticket or object()
+        with self._slots_lock:
+            self._queued[sched_id] = ticket
+        return ticket
+
+    def _unqueue(self, sched_id, ticket) -> bool:
+        """False if the task was dropped by `_forget` or submitted again meanwhile."""
+        with self._slots_lock:
+            if self._queued.get(sched_id) is not ticket:
+                return False
+            del self._queued[sched_id]
+            return True
+
+    def _finish_remote_task(self, task_type, sched_id, future):
+        queued = self._unqueue(sched_id, future)
+        if future.cancelled():
+            if queued:
+                # cancelled by the shutdown, it releases them together.
+                with self._completions_lock:
+                    self._cancelled.append(sched_id)
+            else:
+                # cancelled by `_forget` before it started.
+                self._release_slot(task_type)
+            return
+
+        if future.exception() is not None:
+            logger.warning("exception: {} is occurred".format(future.exception()))
+
+        self._record_execution(task_type, future.exception() is not None)
+        self._task_done(task_type, sched_id)
+
+    def _task_done(self, task_type, sched_id):
+        try:
+            self._complete_task(sched_id)
+        except DatabaseError as e:
+            # the completions stay buffered, the tick flushes them again.
+            logger.warning("Schedium: {} flush is failed: {}".format(self._id, e))
+        finally:
+            self._release_slot(task_type)
+            self.update_in_next_tick()
+
+    def fetch_closed_tasks(self):
         now = time.time()
-        for task in list((tasks or self._tasks)):
-            if task.next_time <= now:
-                self._tasks.remove(task)
-                yield task.task_type, task.task_id, task.sched_id
+        for task in self._tasks.pop_due(now):
+            if self.metrics.enabled:
+                self.metrics.observe("fire_lag_seconds", now - task.next_time)
+            yield task.task_type, task.task_id, task.sched_id
+
+    def execute_task(self, task_type, task_id, sched_id, ticket=None):
+        if ticket is not None and not self._unqueue(sched_id, ticket):
+            # cancelled, paused or rescheduled while waiting in the pool.
+            self._release_slot(task_type)
+            return
 
-    def execute_task(self, task_type, task_id, sched_id):
         if task_type not in self._callbacks:
             logger.warning("the task_type: {} is not existed/registered.".format(task_type))
+            # left to the instances which registered it, instead of renewing
+            # the lease forever.
+            self.safe_release_task(sched_id)
+            self._release_slot(task_type)
             return
 
         target = self._callbacks[task_type]
 
+        start = time.perf_counter()
+        failed = False
         try:
-            target(task_id)
+            result = target(task_id)
+            if inspect.iscoroutine(result):
+                result = asyncio.run(result)
+            return result
         except Exception as e:
+            failed = True
             logger.warning("exception: {} is occurred".format(e))
+            # re-raised so that the pool reports the failed outcome.
+            raise
         finally:
-            self.safe_handle_executed_task(sched_id)
-            self.update_in_next_tick()
+            self._record_execution(task_type, failed, time.perf_counter() - start)
+            self._task_done(task_type, sched_id)
+
+    def _record_execution(self, task_type, failed, duration=None):
+        if not self.metrics.enabled:
+            return
+
+        outcome = "failure" if failed else "success"
+        self.metrics.inc("executions_total", task_type=task_type, outcome=outcome)
+        if duration is not None:
+            self.metrics.observe("callback_seconds", duration, task_type=task_type)
+
+    def _complete_task(self, sched_id):
+        with self._completions_lock:
+            self._completions[sched_id] = time.time()
+            full = len(self._completions) >= self.completion_batch_size
+
+        if full:
+            self.flush_completions()
+
+    def flush_completions(self):
+        with self._completions_lock:
+            executed, self._completions = self._completions, {}
+            self._last_flush_time = time.time()
+
+        if executed:
+            start = time.perf_counter() if self.metrics.enabled else None
+            try:
+                self.safe_handle_executed_tasks(executed)
+            except DatabaseError:
+                # kept for the next flush.
+                with self._completions_lock:
+                    executed.update(self._completions)
+                    self._completions = executed
+                raise
+            if start is not None:
+                self.metrics.observe("flush_seconds", time.perf_counter() - start)
+                self.metrics.inc("completions_total", len(executed))
 
-    @transaction.atomic
     def safe_handle_executed_task(self, sched_id):
+        self.safe_handle_executed_tasks({sched_id: time.time()})
+
+    @transaction.atomic
+    def safe_handle_executed_tasks(self, executed: typing.Dict[str, float]):
         now = time.time()
-        try:
-            job = models.SchediumTask.objects.select_for_update().get(
-                sched_id=sched_id
-            )
+        rows = models.SchediumTask.objects.select_for_update().filter(
+            sched_id__in=list(executed.keys()), lease_owner=self._id
+        ).values_list("sched_id", "next_time", "interval", "cron", "end_time",
+                      "misfire_policy", "misfire_limit")
 
-            job.last_executed_time = now
+        jobs = []
+        for sched_id, next_time, interval, cron, end_time, misfire_policy, misfire_limit in rows:
+            executed_time = executed[sched_id]
+            is_finished = False
 
             # handle loop
-            if job.interval:
-                while job.next_time < now:
-                    job.next_time += float(job.interval)
+            if interval or cron:
+                if cron:
+                    next_time = compile_cron(cron).next_after(max(next_time, executed_time))
+                else:
+                    next_time = next_fire_time(next_time, float(interval), executed_time,
+                                               misfire_policy, misfire_limit)
 
                 # handle finished
-                if job.end_time:
-                    if job.next_time > job.end_time:
-                        job.is_finished = True
+                if end_time:
+                    if next_time > end_time:
+                        is_finished = True
 
             # handle delay
             else:
-                job.is_finished = True
+                is_finished = True
+
+            jobs.append(models.SchediumTask(
+                sched_id=sched_id, next_time=next_time, is_finished=is_finished,
+                last_executed_time=executed_time
+            ))
+
+        self._write_executed_jobs(jobs, now)
 
-            job.in_sched = False
-            job.save(update_fields=["in_sched", "next_time", "is_finished"])
-        except models.SchediumTask.DoesNotExist:
+    def _write_executed_jobs(self, jobs, now):
+        connection = connections[models.SchediumTask.objects.db]
+        if not self._supports_update_from_values(connection):
+            # shared fields in one UPDATE, the per-row ones with bulk_update.
+            models.SchediumTask.objects.filter(
+                sched_id__in=[job.sched_id for job in jobs]
+            ).update(
+                in_sched=False, lease_owner=None, lease_expire=None, updated_time=now
+            )
+            models.SchediumTask.objects.bulk_update(
+                jobs, ["next_time", "is_finished", "last_executed_time"], batch_size=100
+            )
             return
 
+        # UPDATE ... FROM (VALUES ...), VALUES columns are column1..columnN
+        # both on Postgres and SQLite.
+        table = connection.ops.quote_name(models.SchediumTask._meta.db_table)
+        with connection.cursor() as cursor:
+            for offset in range(0, len(jobs), 200):
+                batch = jobs[offset:offset + 200]
+                params = [False, now]
+                for job in batch:
+                    params += [job.sched_id, job.next_time, job.is_finished, job.last_executed_time]
+                cursor.execute(
+                    "UPDATE {table} SET next_time = v.column2, is_finished = v.column3, "
+                    "last_executed_time = v.column4, in_sched = %s, lease_owner = NULL, "
+                    "lease_expire = NULL, updated_time = %s "
+                    "FROM (VALUES {values}) AS v WHERE {table}.sched_id = v.column1".format(
+                        table=table, values=", ".join(["(%s, %s, %s, %s)"] * len(batch))
+                    ),
+                    params
+                )
+
+    @staticmethod
+    def _supports_update_from_values(connection):
+        if connection.vendor == "postgresql":
+            return True
+        if connection.vendor == "sqlite":
+            return sqlite3.sqlite_version_info >= (3, 33)
+        return False
+
     @transaction.atomic
     def safe_release_task(self, sched_id):
         models.SchediumTask.objects.select_for_update().filter(
             sched_id=sched_id
         ).update(
-            in_sched=False
+            in_sched=False, lease_owner=None, lease_expire=None, updated_time=time.time()
         )
 
     @transaction.atomic
@@ -182,37 +676,243 @@ class Schedium(object):
         models.SchediumTask.objects.select_for_update().filter(
             sched_id__in=sched_ids
         ).update(
-            in_sched=False
+            in_sched=False, lease_owner=None, lease_expire=None, updated_time=time.time()
         )
 
     @transaction.atomic
-    def safe_fetch_tasks(self):
+    def safe_fetch_tasks(self, changed_since=None, horizon_since=None, limit=None):
         now = time.time()
-        queryset = models.SchediumTask.objects.select_for_update().filter(
-            next_time__lte=now + 10 * self.tick_interval, in_sched=False, is_finished=False
+        due = models.SchediumTask.objects.select_for_update(skip_locked=True).filter(
+            next_time__lte=now + 10 * self.tick_interval, is_finished=False, is_paused=False
+        )
+
+        # unclaimed and lease-expired rows are fetched by separate queries so
+        # that each one can use its partial index (`schedium_due_idx` and
+        # `schedium_lease_idx`).
+        unclaimed = due.filter(in_sched=False)
+        if changed_since is not None:
+            unclaimed = unclaimed.filter(
+                Q(updated_time__gte=changed_since) | Q(next_time__gt=horizon_since)
+            )
+        expired = due.filter(in_sched=True, lease_expire__lt=now)
+
+        limit = limit or self.claim_limit
+        tasks = []
+        for queryset in (expired, unclaimed):
+            if limit:
+                if len(tasks) >= limit:
+                    break
+                queryset = queryset.order_by("next_time")[:limit - len(tasks)]
+            tasks.extend(map(
+                models.SchediumTaskNamedTuple._make,
+                queryset.values_list(*models.SchediumTaskNamedTuple._fields)
+            ))
+
+        models.SchediumTask.objects.filter(
+            sched_id__in=[task.sched_id for task in tasks]
+        ).update(
+            in_sched=True, lease_owner=self._id, lease_expire=now + self.lease_ttl
         )
-        tasks = [task.dump_named_tuple() for task in queryset.all()]
-        queryset.update(in_sched=True)
         return tasks
 
-    def register(self, task_type: str, callback: typing.Callable):
+    def renew_leases(self):
+        now = time.time()
+        self._last_heartbeat_time = now
+        models.SchediumTask.objects.filter(
+            lease_owner=self._id, in_sched=True
+        ).update(
+            lease_expire=now + self.lease_ttl
+        )
+
+    def add_lane(self, name, size, max_size=None):
+        """add a dedicated thread pool, selected with `register(..., executor=name)`."""
+        if name in self._executors:
+            raise ValueError("executor: {} already exists".format(name))
+
+        lane = Pool(size, result_callback=self.pool.result_callback, max_size=max_size,
+                    idle_timeout=self.pool.idle_timeout)
+        # lanes report into the same bounded result queue as the main pool.
+        lane.result_queue = self.pool.result_queue
+        self._executors[name] = lane
+
+    def register(self, task_type: str, callback: typing.Callable, executor=None,
+                 priority=0, max_concurrency=None):
+        if executor is not None and executor not in self._executors:
+            raise ValueError("unknown executor: {}".format(executor))
+
         self._callbacks[task_type] = callback
+        if executor is None:
+            self._callback_executors.pop(task_type, None)
+        else:
+            self._callback_executors[task_type] = executor
+
+        self._priorities[task_type] = priority
+        if max_concurrency:
+            self._concurrency_limits[task_type] = max_concurrency
+        else:
+            self._concurrency_limits.pop(task_type, None)
 
     # decorator for register callback.
-    def register_task_callback(self, task_type):
+    def register_task_callback(self, task_type, executor=None, priority=0, max_concurrency=None):
 
         def register_callback(func):
-            self.register(task_type, func)
+            if asyncio.iscoroutinefunction(func):
+                @wraps(func)
+                async def wrapper(*args, **kwargs):
+                    return await func(*args, **kwargs)
+            else:
+                @wraps(func)
+                def wrapper(*args, **kwargs):
+                    return func(*args, **kwargs)
 
-            @wraps(func)
-            def wrapper(*args, **kwargs):
-                return func(*args, **kwargs)
+            # the wrapper is what the module exposes under the function's
+            # name, so it is the one that can be pickled for processes.
+            self.register(task_type, wrapper, executor=executor,
+                          priority=priority, max_concurrency=max_concurrency)
 
             return wrapper
 
         return register_callback
 
     def delay_task(self, task_type, task_id, delay, sched_id=None):
+        return self._create_task(**self._delay_task_kwargs(
+            task_type, task_id, delay, sched_id=sched_id
+        ))
+
+    def delay_tasks(self, specs: typing.Iterable[dict], batch_size=1000) -> typing.List[str]:
+        """
+        bulk variant of `delay_task`, each spec holds its keyword arguments:
+
+            schediumer.delay_tasks({"task_type": "remind", "task_id": user_id, "delay": 3600}
+                                   for user_id in user_ids)
+        """
+        return self._create_tasks(
+            (self._delay_task_kwargs(**spec) for spec in specs), batch_size=batch_size
+        )
+
+    def loop_task(self, task_type, task_id, loop_interval,
+                  loop_start=None, loop_end=None, sched_id=None,
+                  first=True, misfire_policy=MISFIRE_SKIP, misfire_limit=None):
+        """
+        run the task every `loop_interval` seconds. `misfire_policy` decides
+        what happens to the intervals missed while it could not run, see
+        `schedium.misfire`.
+        """
+        return self._create_task(**self._loop_task_kwargs(
+            task_type, task_id, loop_interval,
+            loop_start=loop_start, loop_end=loop_end, sched_id=sched_id, first=first,
+            misfire_policy=misfire_policy, misfire_limit=misfire_limit
+        ))
+
+    def loop_tasks(self, specs: typing.Iterable[dict], batch_size=1000) -> typing.List[str]:
+        """bulk variant of `loop_task`, see `delay_tasks`."""
+        return self._create_tasks(
+            (self._loop_task_kwargs(**spec) for spec in specs), batch_size=batch_size
+        )
+
+    def cron_task(self, task_type, task_id, cron, cron_start=None, cron_end=None,
+                  sched_id=None):
+        """
+        run the task at the times matching the cron expression, e.g.
+        "0 9 * * mon-fri", in the Django default time zone, see
+        `schedium.cron`. missed fire times are skipped.
+        """
+        return self._create_task(**self._cron_task_kwargs(
+            task_type, task_id, cron, cron_start=cron_start, cron_end=cron_end,
+            sched_id=sched_id
+        ))
+
+    def cron_tasks(self, specs: typing.Iterable[dict], batch_size=1000) -> typing.List[str]:
+        """bulk variant of `cron_task`, see `delay_tasks`."""
+        return self._create_tasks(
+            (self._cron_task_kwargs(**spec) for spec in specs), batch_size=batch_size
+        )
+
+    def cancel_task(self, sched_id) -> bool:
+        return self.cancel_tasks([sched_id]) > 0
+
+    def cancel_tasks(self, sched_ids: typing.Iterable[str]) -> int:
+        """
+        finish the tasks without running them again, returns how many were
+        cancelled. a run already started completes but is not rescheduled.
+        """
+        return self._update_tasks(sched_ids, {"is_finished": False}, is_finished=True)
+
+    def pause_task(self, sched_id) -> bool:
+        return self.pause_tasks([sched_id]) > 0
+
+    def pause_tasks(self, sched_ids: typing.Iterable[str]) -> int:
+        """keep the tasks from being claimed until `resume_tasks`."""
+        return self._update_tasks(
+            sched_ids, {"is_finished": False, "is_paused": False}, is_paused=True
+        )
+
+    def resume_task(self, sched_id) -> bool:
+        return self.resume_tasks([sched_id]) > 0
+
+    def resume_tasks(self, sched_ids: typing.Iterable[str]) -> int:
+        """paused tasks are claimable again, a missed next_time fires at once."""
+        return self._update_tasks(sched_ids, {"is_paused": True}, is_paused=False)
+
+    def reschedule_task(self, sched_id, next_time) -> bool:
+        return self.reschedule_tasks([sched_id], next_time) > 0
+
+    def reschedule_tasks(self, sched_ids: typing.Iterable[str], next_time) -> int:
+        """
+        move the next run of the tasks to `next_time` (a timestamp or an
+        aware datetime), finished tasks are scheduled again.
+        """
+        if isinstance(next_time, datetime.datetime):
+            next_time = next_time.timestamp()
+        return self._update_tasks(sched_ids, {}, next_time=next_time, is_finished=False)
+
+    def _update_tasks(self, sched_ids, filters, **values):
+        # one UPDATE, the claims are released so that running or in-memory
+        # copies of the tasks are not completed or fired any more.
+        sched_ids = list(sched_ids)
+        if not sched_ids:
+            return 0
+
+        with transaction.atomic():
+            matched = list(models.SchediumTask.objects.select_for_update().filter(
+                sched_id__in=sched_ids, **filters
+            ).values_list("sched_id", flat=True))
+            # forgotten while the rows are still leased to this instance: once
+            # released, the tick may claim them again and must keep that claim.
+            self._forget(matched)
+            count = models.SchediumTask.objects.filter(
+                sched_id__in=matched, **filters
+            ).update(
+                in_sched=False, lease_owner=None, lease_expire=None,
+                updated_time=time.time(), **values
+            )
+            if self.notify:
+                # other processes drop their copies on the wakeup sync.
+                send_notify()
+
+        self.update_in_next_tick()
+        return count
+
+    def _forget(self, sched_ids):
+        for sched_id in sched_ids:
+            self._tasks.remove(sched_id)
+
+        forgotten = set(sched_ids)
+        with self._slots_lock:
+            for tasks in self._deferred.values():
+                if any(sched_id in forgotten for _, sched_id in tasks):
+                    kept = [task for task in tasks if task[1] not in forgotten]
+                    tasks.clear()
+                    tasks.extend(kept)
+            # the pools skip them, a process future is cancelled if it can be.
+            queued = [self._queued.pop(sched_id) for sched_id in forgotten
+                      if sched_id in self._queued]
+
+        for ticket in queued:
+            if isinstance(ticket, Future):
+                ticket.cancel()
+
+    def _delay_task_kwargs(self, task_type, task_id, delay, sched_id=None):
         sched_id = sched_id or uuid.uuid4().hex
         start_time = time.time()
         if isinstance(delay, (int, float)):
@@ -222,15 +922,16 @@ class Schedium(object):
         else:
             end_time = time.time() + int(delay)
 
-        task = self._create_task(sched_id, task_type, task_id,
-                                 start_time=start_time, end_time=end_time,
-                                 interval=None, next_time=end_time)
+        return dict(sched_id=sched_id, task_type=task_type, task_id=task_id,
+                    start_time=start_time, end_time=end_time,
+                    interval=None, next_time=end_time)
 
-        return task
+    def _loop_task_kwargs(self, task_type, task_id, loop_interval,
+                          loop_start=None, loop_end=None, sched_id=None,
+                          first=True, misfire_policy=MISFIRE_SKIP, misfire_limit=None):
+        if misfire_policy not in MISFIRE_POLICIES:
+            raise ValueError("unknown misfire_policy: {}".format(misfire_policy))
 
-    def loop_task(self, task_type, task_id, loop_interval,
-                  loop_start=None, loop_end=None, sched_id=None,
-                  first=True):
         sched_id = sched_id or uuid.uuid4().hex
         loop_start = loop_start or time.time()
         loop_end = loop_end
@@ -239,33 +940,175 @@ class Schedium(object):
         else:
             next_time = loop_start + loop_interval
 
-        return self._create_task(
-            sched_id, task_type, task_id,
-            start_time=loop_start, end_time=loop_end,
-            interval=loop_interval, next_time=next_time
-        )
+        return dict(sched_id=sched_id, task_type=task_type, task_id=task_id,
+                    start_time=loop_start, end_time=loop_end,
+                    interval=loop_interval, next_time=next_time,
+                    misfire_policy=misfire_policy, misfire_limit=misfire_limit)
+
+    def _cron_task_kwargs(self, task_type, task_id, cron, cron_start=None, cron_end=None,
+                          sched_id=None):
+        sched_id = sched_id or uuid.uuid4().hex
+        cron_start = cron_start or time.time()
+        next_time = compile_cron(cron).next_after(cron_start)
+
+        return dict(sched_id=sched_id, task_type=task_type, task_id=task_id,
+                    start_time=cron_start, end_time=cron_end,
+                    interval=None, next_time=next_time, cron=cron)
 
     def _create_task(self, sched_id, task_type, task_id,
-                     start_time, end_time, interval, next_time):
+                     start_time, end_time, interval, next_time, **options):
         task = models.SchediumTask.objects.create(
             # basic
             sched_id=sched_id, task_type=task_type, task_id=task_id,
             # sched
             start_time=start_time, end_time=end_time, interval=interval,
-            next_time=next_time, in_sched=False
+            next_time=next_time, in_sched=False, **options
         )
+        self._notify_created(next_time)
         self.update_in_next_tick()
         return task
 
+    def _create_tasks(self, tasks: typing.Iterable[dict], batch_size=1000):
+        sched_ids = []
+        batch = []
+        first_time = None
+
+        # bulk_create skips `SchediumTask.save`, so check end_time here.
+        with transaction.atomic():
+            for kwargs in tasks:
+                if kwargs["end_time"] and kwargs["end_time"] < kwargs["start_time"]:
+                    raise ValueError("end_time should be after start_time.")
+
+                batch.append(models.SchediumTask(in_sched=False, **kwargs))
+                sched_ids.append(kwargs["sched_id"])
+                if first_time is None or kwargs["next_time"] < first_time:
+                    first_time = kwargs["next_time"]
+                if len(batch) >= batch_size:
+                    models.SchediumTask.objects.bulk_create(batch, batch_size=batch_size)
+                    batch = []
+
+            if batch:
+                models.SchediumTask.objects.bulk_create(batch, batch_size=batch_size)
+            if first_time is not None:
+                # a NOTIFY is delivered when the transaction commits.
+                self._notify_created(first_time)
+
+        self.update_in_next_tick()
+        return sched_ids
+
+    def _notify_created(self, next_time):
+        if self.notify and next_time < time.time() + 10 * self.tick_interval:
+            send_notify(repr(next_time))
+
+    def stats(self) -> dict:
+        """point-in-time snapshot of the scheduler, its executors and metrics."""
+        return {
+            "id": self._id,
+            "tasks_in_memory": len(self._tasks),
+            "deferred_tasks": sum(len(tasks) for tasks in self._deferred.values()),
+            "pending_completions": len(self._completions),
+            "last_sync_time": self._last_sync_time,
+            "executors": {
+                name: executor.stats() for name, executor in self._executors.items()
+            },
+            "metrics": self.metrics.snapshot(),
+        }
+
+    def render_prometheus(self) -> str:
+        stats = self.stats()
+        gauges = [
+            ("tasks_in_memory", None, stats["tasks_in_memory"]),
+            ("deferred_tasks", None, stats["deferred_tasks"]),
+            ("pending_completions", None, stats["pending_completions"]),
+        ]
+        for name, executor_stats in stats["executors"].items():
+            for key, value in executor_stats.items():
+                gauges.append(("executor_" + key, {"executor": name}, value))
+
+        return self.metrics.render_prometheus(gauges)
+
     def shutdown(self):
+        """
+        stop gracefully: the tick loop stops claiming and dispatching,
+        running tasks are finished and written back, and the claimed tasks
+        which were not started yet are released in one statement for other
+        instances to pick up. returns the number of released tasks.
+        """
         self._tick_start_event.clear()
-        self._tick_thread.join()
+        # wake up an event driven tick loop waiting for the next task.
+        self.update_in_next_tick()
+        if self._tick_thread:
+            self._tick_thread.join()
 
-        self.pool.stop()
+        with self._submit_lock:
+            self._draining = True
+        # tasks waiting for a concurrency slot are not handed over any more.
+        with self._slots_lock:
+            unstarted = [sched_id for tasks in self._deferred.values() for _, sched_id in tasks]
+            self._deferred = {}
+
+        for executor in self._executors.values():
+            if executor.is_working():
+                for _task in executor.stop() or []:
+                    # the ones dropped by `_forget` are not claimed any more.
+                    if "sched_id" in _task.kwargs and \
+                            self._unqueue(_task.kwargs["sched_id"], _task.kwargs["ticket"]):
+                        unstarted.append(_task.kwargs["sched_id"])
+        # write back everything executed before the pools were stopped.
+        self.flush_completions()
+
+        with self._completions_lock:
+            unstarted += self._cancelled
+            self._cancelled = []
+        unstarted += self._tasks.sched_ids()
+        self._tasks.clear()
+        if unstarted:
+            self.safe_release_task_bench(unstarted)
+
+        if self._sweeper_thread:
+            self._sweeper_stop_event.set()
+            self._sweeper_thread.join()
+            self._sweeper_thread = None
+
+        if self._watcher:
+            self._watcher.stop()
+            self._watcher = None
+
+        return len(unstarted)
+
+    def configure_workers(self, pool_size=None, pool_max_size=None, process_pool_size=None):
+        """resize the thread pool and the process pool before `start`."""
+        if self.is_running():
+            raise RuntimeError("cannot resize the workers of a running Schedium")
+
+        if pool_size:
+            self.pool.size = pool_size
+            self.pool.max_size = max(self.pool.max_size, pool_size)
+        if pool_max_size:
+            self.pool.max_size = max(pool_max_size, self.pool.size)
+        if process_pool_size:
+            self._executors["process"].size = process_pool_size
+
+    def is_running(self):
+        return self._tick_thread is not None and self._tick_thread.is_alive()
 
     def reset(self):
         self.shutdown()
         self.start()
 
 
-schediumer = Schedium()
+def _default_schedium():
+    return Schedium(**dict(conf.get("OPTIONS"), autostart=False))
+
+
+# the default scheduler, only built on first use and never started by
+# importing this module, see `start_schediumer`.
+schediumer = SimpleLazyObject(_default_schedium)
+
+
+def start_schediumer() -> Schedium:
+    """import SCHEDIUM_TASK_MODULES and start the default scheduler."""
+    for module in conf.get("TASK_MODULES"):
+        import_module(module)
+    schediumer.start()
+    return schediumer
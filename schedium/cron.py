@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# coding:utf-8
+import calendar
+import datetime
+import functools
+
+from django.utils import timezone
+
+_ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# hard-coded, `calendar.month_abbr` follows the locale.
+_MONTHS = {name: index for index, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1
+)}
+# cron counts the days of the week from sunday (0, also 7).
+_WEEKDAYS = {name: index for index, name in enumerate(
+    ["sun", "mon", "tue", "wed", "thu", "fri", "sat"]
+)}
+
+# (lowest, highest, names) of minute, hour, day of month, month, day of week.
+_FIELDS = (
+    (0, 59, {}),
+    (0, 23, {}),
+    (1, 31, {}),
+    (1, 12, _MONTHS),
+    (0, 7, _WEEKDAYS),
+)
+
+# the search gives up after this many years without a match (e.g. "0 0 30 2 *").
+_MAX_YEARS = 8
+
+
+def _next_bit(mask, value):
+    """the lowest set bit of mask at or above value, None if there is none."""
+    mask >>= value
+    if not mask:
+        return None
+    return value + (mask & -mask).bit_length() - 1
+
+
+def _parse_field(text, lowest, highest, names):
+    def number(token):
+        token = token.lower()
+        value = names[token] if token in names else int(token)
+        if not lowest <= value <= highest:
+            raise ValueError("{} is out of range {}-{}".format(value, lowest, highest))
+        return value
+
+    mask = 0
+    for part in text.split(","):
+        step = 1
+        if "/" in part:
+            part, step = part.split("/", 1)
+            step = int(step)
+            if step < 1:
+                raise ValueError("invalid step: {}".format(step))
+
+        if part == "*":
+            start, end = lowest, highest
+        elif "-" in part:
+            start, end = (number(token) for token in part.split("-", 1))
+        else:
+            start = number(part)
+            end = highest if step > 1 else start
+
+        if start > end:
+            raise ValueError("invalid range: {}-{}".format(start, end))
+        for value in range(start, end + 1, step):
+            mask |= 1 << value
+    return mask
+
+
+class CronExpression(object):
+    """
+    compiled five field cron expression ("minute hour day month weekday",
+    or an alias such as "@daily") evaluated in the time zone `tz`, the
+    Django default time zone if None.
+
+    every field is a bitset, `next_after` jumps straight to the next
+    matching month, day, hour and minute instead of testing minute by
+    minute. like cron, a restricted day of month and day of week match
+    when either of them does.
+    """
+
+    def __init__(self, expression, tz=None):
+        self.expression = expression
+        self.tz = tz or timezone.get_default_timezone()
+
+        fields = _ALIASES.get(expression.strip().lower(), expression).split()
+        if len(fields) != 5:
+            raise ValueError("cron expression: {!r} needs 5 fields".format(expression))
+        try:
+            masks = [_parse_field(text, *spec) for text, spec in zip(fields, _FIELDS)]
+        except ValueError as e:
+            raise ValueError("cron expression: {!r} is invalid: {}".format(expression, e))
+
+        self.minutes, self.hours, self.days, self.months, weekdays = masks
+        # sunday is both 0 and 7.
+        self.weekdays = (weekdays | weekdays >> 7) & 0x7f
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+        self._month_days = {}
+
+    def _days_of_month(self, year, month):
+        days = self._month_days.get((year, month))
+        if days is None:
+            days = self._month_days[(year, month)] = self._match_days(year, month)
+        return days
+
+    def _match_days(self, year, month):
+        first_weekday, length = calendar.monthrange(year, month)
+        # calendar counts from monday, cron from sunday.
+        first_weekday = (first_weekday + 1) % 7
+
+        weekdays = 0
+        for day in range(1, length + 1):
+            if self.weekdays >> ((first_weekday + day - 1) % 7) & 1:
+                weekdays |= 1 << day
+        days = self.days & ((1 << (length + 1)) - 1)
+
+        if self.any_day:
+            return weekdays
+        if self.any_weekday:
+            return days
+        return days | weekdays
+
+    def next_after(self, timestamp) -> float:
+        """the first matching time strictly after the unix timestamp."""
+        local = datetime.datetime.fromtimestamp(timestamp, self.tz).replace(
+            tzinfo=None, second=0, microsecond=0
+        ) + datetime.timedelta(minutes=1)
+        year, month, day, hour, minute = local.year, local.month, local.day, local.hour, local.minute
+
+        while year <= local.year + _MAX_YEARS:
+            found = _next_bit(self.months, month)
+            if found is None:
+                year, month, day, hour, minute = year + 1, 1, 1, 0, 0
+                continue
+            if found != month:
+                month, day, hour, minute = found, 1, 0, 0
+
+            found = _next_bit(self._days_of_month(year, month), day)
+            if found is None:
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+                day, hour, minute = 1, 0, 0
+                continue
+            if found != day:
+                day, hour, minute = found, 0, 0
+
+            found = _next_bit(self.hours, hour)
+            if found is None:
+                # the day search moves on to the next month if needed.
+                day, hour, minute = day + 1, 0, 0
+                continue
+            if found != hour:
+                hour, minute = found, 0
+
+            found = _next_bit(self.minutes, minute)
+            if found is None:
+                hour, minute = hour + 1, 0
+                continue
+
+            result = datetime.datetime(year, month, day, hour, found, tzinfo=self.tz).timestamp()
+            if result > timestamp:
+                return result
+            # repeated wall clock time when the clocks go back.
+            minute = found + 1
+
+        raise ValueError("cron expression: {!r} never matches".format(self.expression))
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_cron(expression, tz=None) -> CronExpression:
+    """cached `CronExpression`, the completions of a cron task reuse it."""
+    return CronExpression(expression, tz)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from schedium.retention import purge_finished_tasks
+
+
+class Command(BaseCommand):
+    help = "Delete finished schedium tasks older than a given age, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than", type=float, default=7 * 24 * 3600,
+                            help="age in seconds of finished tasks to delete (default: 7 days)")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="rows deleted per transaction")
+        parser.add_argument("--pause", type=float, default=0,
+                            help="seconds to sleep between batches")
+
+    def handle(self, *args, **options):
+        total = purge_finished_tasks(
+            options["older_than"], batch_size=options["batch_size"], pause=options["pause"]
+        )
+        self.stdout.write("purged {} finished tasks.".format(total))
@@ -0,0 +1,49 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from schedium.core import schediumer, start_schediumer
+
+
+class Command(BaseCommand):
+    help = "Run the default schedium scheduler as a standalone service until SIGINT / SIGTERM."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int,
+                            help="threads running the callbacks (pool_size)")
+        parser.add_argument("--max-workers", type=int,
+                            help="upper bound of an elastic thread pool (pool_max_size)")
+        parser.add_argument("--processes", type=int,
+                            help="processes of the process executor (process_pool_size)")
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+
+        def on_signal(signum, frame):
+            if stop.is_set():
+                # second signal: give up draining.
+                raise SystemExit(1)
+            self.stdout.write("received {}, draining...".format(signal.Signals(signum).name))
+            stop.set()
+
+        signal.signal(signal.SIGINT, on_signal)
+        signal.signal(signal.SIGTERM, on_signal)
+
+        workers = dict(pool_size=options["workers"], pool_max_size=options["max_workers"],
+                       process_pool_size=options["processes"])
+        if any(workers.values()):
+            if schediumer.is_running():
+                # already started by SCHEDIUM_AUTOSTART, restarted with the new workers.
+                schediumer.shutdown()
+            schediumer.configure_workers(**workers)
+        schedium = start_schediumer()
+        self.stdout.write("schedium: {} is running, quit with CONTROL-C.".format(schedium._id))
+
+        while not stop.wait(1):
+            if not schedium.is_running():
+                break
+
+        released = schedium.shutdown()
+        self.stdout.write("schedium: {} is stopped, {} unstarted tasks released.".format(
+            schedium._id, released))
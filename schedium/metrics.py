@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# coding:utf-8
+import bisect
+import logging
+import typing
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 60)
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items())) if labels else ()
+
+
+class Metrics(object):
+    """
+    in-process counters and histograms for Schedium and its pools.
+
+    `snapshot()` returns a plain dict, `render_prometheus()` the Prometheus
+    text format, and every exporter (a callable taking the snapshot) is
+    called on `export()`. use `NullMetrics` to turn instrumentation off.
+    """
+    enabled = True
+
+    def __init__(self, prefix="schedium", buckets=DEFAULT_BUCKETS,
+                 exporters: typing.Iterable[typing.Callable] = ()):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self.exporters = list(exporters)
+
+        self._counters = {}
+        self._histograms = {}
+        self._lock = Lock()
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # per-bucket counts, then sum and count.
+                histogram = self._histograms[key] = [0] * len(self.buckets) + [0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                histogram[index] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(value) for key, value in self._histograms.items()}
+
+        return {
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(counters.items())
+            ],
+            "histograms": [
+                {
+                    "name": name, "labels": dict(labels),
+                    "buckets": dict(zip(self.buckets, histogram[:-2])),
+                    "sum": histogram[-2], "count": histogram[-1],
+                }
+                for (name, labels), histogram in sorted(histograms.items())
+            ],
+        }
+
+    def export(self, snapshot=None):
+        snapshot = snapshot or self.snapshot()
+        for exporter in self.exporters:
+            try:
+                exporter(snapshot)
+            except Exception as e:
+                logger.warning("metrics exporter: {} is failed: {}".format(exporter, e))
+
+    def render_prometheus(self, gauges: typing.Iterable[typing.Tuple[str, dict, float]] = ()) -> str:
+        """render the metrics and extra `(name, labels, value)` gauges as Prometheus text."""
+        snapshot = self.snapshot()
+        lines = []
+
+        def line(name, labels, value):
+            if labels:
+                label_text = ",".join('{}="{}"'.format(k, str(v).replace('"', '\\"'))
+                                      for k, v in sorted(labels.items()))
+                lines.append("{}_{}{{{}}} {}".format(self.prefix, name, label_text, value))
+            else:
+                lines.append("{}_{} {}".format(self.prefix, name, value))
+
+        typed = set()
+        for counter in snapshot["counters"]:
+            if counter["name"] not in typed:
+                typed.add(counter["name"])
+                lines.append("# TYPE {}_{} counter".format(self.prefix, counter["name"]))
+            line(counter["name"], counter["labels"], counter["value"])
+
+        for histogram in snapshot["histograms"]:
+            name = histogram["name"]
+            if name not in typed:
+                typed.add(name)
+                lines.append("# TYPE {}_{} histogram".format(self.prefix, name))
+            cumulative = 0
+            for bound, count in histogram["buckets"].items():
+                cumulative += count
+                line(name + "_bucket", dict(histogram["labels"], le=bound), cumulative)
+            line(name + "_bucket", dict(histogram["labels"], le="+Inf"), histogram["count"])
+            line(name + "_sum", histogram["labels"], histogram["sum"])
+            line(name + "_count", histogram["labels"], histogram["count"])
+
+        for name, labels, value in gauges:
+            if name not in typed:
+                typed.add(name)
+                lines.append("# TYPE {}_{} gauge".format(self.prefix, name))
+            line(name, labels, value)
+
+        return "\n".join(lines) + "\n"
+
+
+class NullMetrics(Metrics):
+    """metrics turned off: recording is a no-op."""
+    enabled = False
+
+    def inc(self, name, value=1, **labels):
+        pass
+
+    def observe(self, name, value, **labels):
+        pass
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedium', '0003_auto_20181029_1016'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='schediumtask',
+            name='end_time',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='schediumtask',
+            name='interval',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='schediumtask',
+            name='last_executed_time',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='schediumtask',
+            name='next_time',
+            field=models.FloatField(),
+        ),
+        migrations.AlterField(
+            model_name='schediumtask',
+            name='start_time',
+            field=models.FloatField(),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:42
+
+import time
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedium', '0004_sub_second_time'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schediumtask',
+            name='updated_time',
+            field=models.FloatField(db_index=True, default=time.time),
+        ),
+    ]
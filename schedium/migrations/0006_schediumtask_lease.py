@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedium', '0005_schediumtask_updated_time'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schediumtask',
+            name='lease_expire',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='schediumtask',
+            name='lease_owner',
+            field=models.CharField(max_length=200, null=True),
+        ),
+    ]
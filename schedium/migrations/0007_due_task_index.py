@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedium', '0006_schediumtask_lease'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='schediumtask',
+            index=models.Index(condition=models.Q(('in_sched', False), ('is_finished', False)), fields=['next_time'], name='schedium_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schediumtask',
+            index=models.Index(condition=models.Q(('in_sched', True)), fields=['lease_expire'], name='schedium_lease_idx'),
+        ),
+    ]
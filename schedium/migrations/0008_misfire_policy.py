@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedium', '0007_due_task_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schediumtask',
+            name='misfire_limit',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='schediumtask',
+            name='misfire_policy',
+            field=models.CharField(default='skip', max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedium', '0008_misfire_policy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schediumtask',
+            name='cron',
+            field=models.CharField(max_length=200, null=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedium', '0009_schediumtask_cron'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='schediumtask',
+            name='schedium_due_idx',
+        ),
+        migrations.AddField(
+            model_name='schediumtask',
+            name='is_paused',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='schediumtask',
+            index=models.Index(condition=models.Q(('in_sched', False), ('is_finished', False), ('is_paused', False)), fields=['next_time'], name='schedium_due_idx'),
+        ),
+    ]
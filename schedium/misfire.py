@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# coding:utf-8
+import math
+
+# what a loop task does with the intervals it missed, e.g. while no
+# scheduler was running:
+#
+# - skip:     drop them, fire again at the next interval in the future.
+# - run_once: fire once right away for all of them, then as usual.
+# - coalesce: same as run_once.
+# - run_all:  fire once per missed interval, back to back, at most
+#             `misfire_limit` times (unlimited if None).
+MISFIRE_SKIP = "skip"
+MISFIRE_RUN_ONCE = "run_once"
+MISFIRE_COALESCE = "coalesce"
+MISFIRE_RUN_ALL = "run_all"
+
+MISFIRE_POLICIES = (MISFIRE_SKIP, MISFIRE_RUN_ONCE, MISFIRE_COALESCE, MISFIRE_RUN_ALL)
+
+
+def next_fire_time(next_time, interval, executed_time,
+                   misfire_policy=MISFIRE_SKIP, misfire_limit=None) -> float:
+    """
+    the next fire time of a loop task whose run due at `next_time` was
+    executed at `executed_time`, in O(1) whatever the number of missed
+    intervals.
+    """
+    if executed_time <= next_time:
+        return next_time
+
+    # intervals to add to get past executed_time, the ones before are missed.
+    steps = math.ceil((executed_time - next_time) / interval)
+    if next_time + steps * interval < executed_time:
+        # float rounding
+        steps += 1
+    missed = steps - 1
+
+    if misfire_policy in (MISFIRE_RUN_ONCE, MISFIRE_COALESCE):
+        steps -= min(missed, 1)
+    elif misfire_policy == MISFIRE_RUN_ALL:
+        steps -= missed if misfire_limit is None else min(missed, misfire_limit)
+
+    return next_time + steps * interval
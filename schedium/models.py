@@ -2,10 +2,13 @@ import time
 import uuid
 import typing
 from django.db import models
-import pydantic
 
 
-class SchediumTaskNamedTuple(pydantic.BaseModel):
+class SchediumTaskNamedTuple(typing.NamedTuple):
+    """
+    in-memory record of a scheduled task, built straight from
+    `values_list(*SchediumTaskNamedTuple._fields)` without model instances.
+    """
     sched_id: str
     task_type: str
     task_id: str
@@ -27,14 +30,37 @@ class SchediumTask(models.Model):
     task_id = models.CharField(max_length=2000, null=False)
 
     # sched fields
-    start_time = models.IntegerField(null=False)
-    next_time = models.IntegerField(null=False)
-    end_time = models.IntegerField(null=True)
-    interval = models.IntegerField(null=True)
-    last_executed_time = models.IntegerField(null=True)
+    start_time = models.FloatField(null=False)
+    next_time = models.FloatField(null=False)
+    end_time = models.FloatField(null=True)
+    interval = models.FloatField(null=True)
+    last_executed_time = models.FloatField(null=True)
+    # cron expression of cron tasks, see `schedium.cron`.
+    cron = models.CharField(max_length=200, null=True)
+    # loop tasks only, see `schedium.misfire`.
+    misfire_policy = models.CharField(max_length=20, null=False, default="skip")
+    misfire_limit = models.PositiveIntegerField(null=True)
+    # bumped whenever a row becomes (re)claimable, drives the delta sync.
+    updated_time = models.FloatField(null=False, default=time.time, db_index=True)
 
     is_finished = models.BooleanField(null=False, default=False)
+    # paused tasks are not claimed until resumed.
+    is_paused = models.BooleanField(null=False, default=False)
     in_sched = models.BooleanField(null=False, default=False)
+    # the Schedium instance holding the claim and when the claim lapses.
+    lease_owner = models.CharField(max_length=200, null=True)
+    lease_expire = models.FloatField(null=True)
+
+    class Meta:
+        indexes = [
+            # the due-task query: backends without partial indexes (MySQL)
+            # ignore the condition and build a plain index on next_time.
+            models.Index(fields=["next_time"], name="schedium_due_idx",
+                         condition=models.Q(in_sched=False, is_finished=False, is_paused=False)),
+            # claims whose lease may have expired.
+            models.Index(fields=["lease_expire"], name="schedium_lease_idx",
+                         condition=models.Q(in_sched=True)),
+        ]
 
     def save(self, force_insert=False, force_update=False, using=None,
              update_fields=None):
@@ -49,6 +75,6 @@ class SchediumTask(models.Model):
         return super().save(force_insert, force_update, using, update_fields)
 
     def dump_named_tuple(self) -> SchediumTaskNamedTuple:
-        return SchediumTaskNamedTuple(
-            **self.__dict__
+        return SchediumTaskNamedTuple._make(
+            getattr(self, field) for field in SchediumTaskNamedTuple._fields
         )
\ No newline at end of file
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# coding:utf-8
+"""
+cross-process wakeup: a process creating a task due soon wakes the
+scheduler nodes of the other processes instead of leaving the task to
+their next periodic sync.
+
+on Postgres the creator sends a NOTIFY on `CHANNEL` in the inserting
+transaction (delivered on commit) and every node LISTENs on a dedicated
+connection. other databases have no such channel, the nodes poll the
+indexed `updated_time` for new claimable rows due soon instead.
+"""
+import logging
+import select
+import time
+from threading import Thread, Event
+
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from schedium import models
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "schedium"
+
+
+def send_notify(payload="", using=DEFAULT_DB_ALIAS, channel=CHANNEL):
+    """NOTIFY the listeners, a no-op on databases other than Postgres."""
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_notify(%s, %s)", [channel, payload])
+
+
+class _Watcher(Thread):
+    def __init__(self, on_notify, using=DEFAULT_DB_ALIAS):
+        Thread.__init__(self, name="schedium-{}".format(type(self).__name__.lower()))
+        self.daemon = True
+        self.on_notify = on_notify
+        self.using = using
+        self._stop_event = Event()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class Listener(_Watcher):
+    """
+    LISTEN on `channel` and call `on_notify()` for the notifications, also
+    after every (re)connection since notifications sent in between are lost.
+    works with psycopg2 and psycopg 3.2+.
+    """
+
+    def __init__(self, on_notify, using=DEFAULT_DB_ALIAS, channel=CHANNEL,
+                 timeout=1, retry_interval=2):
+        super().__init__(on_notify, using)
+        self.channel = channel
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+
+    def run(self):
+        while not self._stop_event.is_set():
+            conn = None
+            try:
+                conn = self._connect()
+                self.on_notify()
+                self._listen(conn)
+            except Exception as e:
+                logger.warning("schedium listener: {} is failed: {}, retry {}s later.".format(
+                    self.channel, e, self.retry_interval))
+                self._stop_event.wait(self.retry_interval)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def _connect(self):
+        wrapper = connections[self.using]
+        conn = wrapper.get_new_connection(wrapper.get_connection_params())
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute("LISTEN {}".format(wrapper.ops.quote_name(self.channel)))
+        return conn
+
+    def _listen(self, conn):
+        while not self._stop_event.is_set():
+            if hasattr(conn, "poll"):
+                # psycopg2
+                if not select.select([conn], [], [], self.timeout)[0]:
+                    continue
+                conn.poll()
+                notified = bool(conn.notifies)
+                del conn.notifies[:]
+            else:
+                notified = bool(list(conn.notifies(timeout=self.timeout, stop_after=1)))
+
+            if notified:
+                self.on_notify()
+
+
+class Poller(_Watcher):
+    """
+    polling fallback of `Listener`: every `interval` seconds, call
+    `on_notify()` if an unclaimed task due within `window` seconds was
+    created or released since the previous check.
+    """
+
+    def __init__(self, on_notify, window, using=DEFAULT_DB_ALIAS, interval=0.5, margin=2):
+        super().__init__(on_notify, using)
+        self.window = window
+        self.interval = interval
+        # tolerated clock skew between the writers and this process.
+        self.margin = margin
+
+    def run(self):
+        since = time.time()
+        while not self._stop_event.wait(self.interval):
+            now = time.time()
+            try:
+                # the claim condition (`schedium_due_idx`): pausing a task
+                # bumps its updated_time too but must not wake anyone.
+                if models.SchediumTask.objects.using(self.using).filter(
+                        updated_time__gte=since - self.margin, next_time__lt=now + self.window,
+                        in_sched=False, is_finished=False, is_paused=False,
+                ).exists():
+                    self.on_notify()
+                since = now
+            except DatabaseError as e:
+                logger.warning("schedium poller is failed: {}".format(e))
+        connections.close_all()
+
+
+def watcher(on_notify, window, using=DEFAULT_DB_ALIAS, poll_interval=0.5) -> _Watcher:
+    """a `Listener` on Postgres, a `Poller` elsewhere."""
+    if connections[using].vendor == "postgresql":
+        return Listener(on_notify, using)
+    return Poller(on_notify, window, using, interval=poll_interval)
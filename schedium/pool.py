@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
+import itertools
+import time
 import traceback
 import unittest
 import uuid
-from queue import Queue, Empty
-from threading import Thread, Event
+from concurrent.futures import Executor, Future
+from queue import Queue, PriorityQueue, Empty, Full
+from threading import Thread, Event, Lock
 from django.db import connections
 
+# put into the task queue once per labor to stop it.
+_STOP = object()
+
 
 class _Task(object):
     def __init__(self, func, args: list, kwargs: dict, id=None):
@@ -15,19 +21,30 @@ class _Task(object):
         self.func = func
         self.args = args
         self.kwargs = kwargs
+        self.future = Future()
 
 
 class _Result(object):
-    def __init__(self, task, result=None, traceback=None):
+    def __init__(self, task, result=None, traceback=None, exception=None, duration=None):
         self.task = task
         self.result = result
         self.traceback = traceback
+        self.exception = exception
+        self.duration = duration
+
+    @property
+    def succeeded(self):
+        return self.traceback is None
 
 
 class _Labor(Thread):
-    def __init__(self, taskq, resultq, name=None):
+    def __init__(self, taskq, on_result, name=None, idle_timeout=None, on_idle=None):
         self.taskq = taskq
-        self.resultq = resultq
+        self.on_result = on_result
+        # elastic pools: `on_idle(labor)` is asked after `idle_timeout`
+        # seconds without a task whether this labor should exit.
+        self.idle_timeout = idle_timeout
+        self.on_idle = on_idle
         name = name if name else "_labor-{}".format(uuid.uuid4())
         Thread.__init__(self, name=name)
         self.daemon = True
@@ -46,24 +63,43 @@ class _Labor(Thread):
     def _run(self):
         while self.labor_is_working:
             try:
-                _task = self.taskq.get(timeout=1)
-                self.is_executing_task.set()
+                _, _, _task = self.taskq.get(timeout=self.idle_timeout)
             except Empty:
+                if self.on_idle and self.on_idle(self):
+                    self.labor_is_working = False
+                continue
+            if _task is _STOP:
+                self.labor_is_working = False
+                break
+            if not _task.future.set_running_or_notify_cancel():
                 continue
+
+            self.is_executing_task.set()
+            start = time.time()
+            exception = None
             try:
                 # assert isinstance(_task, _Task)
                 result = _task.func(*_task.args, **_task.kwargs)
                 trackinfo = None
-            except:
+            except Exception as e:
+                exception = e
                 try:
                     trackinfo = traceback.format_exc()
                 except:
                     trackinfo = "UNKNOW ERROR!"
                 result = None
-            self.resultq.put(_Result(
-                _task, result, trackinfo
-            ))
-            self.is_executing_task.clear()
+
+            if exception is None:
+                _task.future.set_result(result)
+            else:
+                _task.future.set_exception(exception)
+
+            try:
+                self.on_result(_Result(
+                    _task, result, trackinfo, exception, time.time() - start
+                ))
+            finally:
+                self.is_executing_task.clear()
 
     def prepare_stop(self):
         self.labor_is_working = False
@@ -72,57 +108,174 @@ class _Labor(Thread):
         self.join()
 
 
-class Pool(object):
-    def __init__(self, size=20, _laborcls=_Labor, *args, **kwargs):
+class Pool(Executor):
+    """
+    thread pool, also usable as a `concurrent.futures.Executor`: `submit`
+    and `map` run on the labors and return/yield through futures.
+
+    results of executed tasks are discarded unless consumed:
+
+    - the future returned by `execute` / `submit`.
+    - result_callback: called with every `_Result` in the labor thread.
+    - result_queue_size: keep the latest results in a bounded
+      `result_queue`, the oldest result is dropped when it is full.
+
+    tasks with a higher `priority` are started first, equal priorities in
+    submission order.
+
+    with `max_size` above `size` the pool is elastic: labors are added
+    while the backlog exceeds the idle labors, up to `max_size`, and
+    labors idle for `idle_timeout` seconds exit down to `size`.
+    """
+
+    def __init__(self, size=20, _laborcls=_Labor, *args,
+                 result_callback=None, result_queue_size=0,
+                 max_size=None, idle_timeout=60, **kwargs):
         self.size = size
-        self.mainthread = None
+        self.max_size = max(max_size or size, size)
+        self.idle_timeout = idle_timeout
 
         self._threads = {}
+        self._threads_lock = Lock()
         self._working = False
-        self._dispatcher_queue = Queue()
-        self.task_queue = Queue()
-        self.result_queue = Queue()
+        self.task_queue = PriorityQueue()
+        self._sequence = itertools.count()
+        # monotonic counters for monitoring, see `stats`.
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.result_queue = Queue(maxsize=result_queue_size) if result_queue_size > 0 else None
+        self.result_callback = result_callback
         self._laborcls = _laborcls
 
     def start(self):
+        self._working = True
         [self._new_labor() for _ in range(self.size)]
 
-        self.mainthread = Thread(name="pool-main", target=self._main)
-        self.mainthread.daemon = True
-        self.mainthread.start()
+    def execute(self, func, args=(), kwargs={}, id=None, priority=0) -> Future:
+        _t = _Task(func, args, kwargs, id)
+        self.task_queue.put((-priority, next(self._sequence), _t))
+        self.submitted += 1
+        if self.is_elastic():
+            self._grow()
+        return _t.future
+
+    def is_elastic(self):
+        return self.max_size > self.size
 
-    def _main(self):
-        self._working = True
-        while self._working:
+    def _grow(self):
+        with self._threads_lock:
+            if not self._working or len(self._threads) >= self.max_size:
+                return
+            if self.task_queue.qsize() > len(self._threads) - self.busy_count():
+                self._new_labor()
+
+    def _retire_labor(self, labor):
+        with self._threads_lock:
+            if not self._working or len(self._threads) <= self.size:
+                return False
+            self._threads.pop(labor.name, None)
+            return True
+
+    def execute_many(self, calls) -> list:
+        """submit an iterable of `(func, args, kwargs)`, return their futures."""
+        return [self.execute(func, args, kwargs) for func, args, kwargs in calls]
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        if not self._working:
+            raise RuntimeError("cannot submit to a pool which is not working")
+        return self.execute(fn, args, kwargs)
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.stop(cancel_pending=cancel_futures, wait=wait)
+
+    def _on_result(self, result):
+        self.completed += 1
+        if not result.succeeded:
+            self.failed += 1
+
+        if self.result_callback:
             try:
-                _ret = self._dispatcher_queue.get(timeout=1)
-                if isinstance(_ret, _Task):
-                    self.task_queue.put(_ret, block=False)
-                elif isinstance(_ret, _Result):
-                    self.result_queue.put(_ret, block=False)
-            except Empty:
-                pass
+                self.result_callback(result)
+            except Exception as e:
+                print('result callback is failed: {}'.format(e))
 
-        connections.close_all()
+        if self.result_queue is not None:
+            while True:
+                try:
+                    self.result_queue.put_nowait(result)
+                    break
+                except Full:
+                    try:
+                        self.result_queue.get_nowait()
+                    except Empty:
+                        pass
 
-    def execute(self, func, args=(), kwargs={}, id=None):
-        _t = _Task(func, args, kwargs, id)
-        self._dispatcher_queue.put(_t)
+    def drain(self) -> list:
+        """remove the tasks which are not started yet from the queue."""
+        pending = []
+        while True:
+            try:
+                _, _, _task = self.task_queue.get_nowait()
+            except Empty:
+                break
+            if _task is not _STOP:
+                pending.append(_task)
+        return pending
 
-    def stop(self):
-        self._working = False
-        if self.mainthread:
-            self.mainthread.join()
-        [i.prepare_stop() for i in self._threads.values()]
-        [i.stop() for i in self._threads.values()]
+    def stop(self, cancel_pending=True, wait=True) -> list:
+        """
+        stop the labors after their current task. pending tasks are
+        cancelled and returned, or executed first if not `cancel_pending`.
+        """
+        with self._threads_lock:
+            self._working = False
+        pending = []
+        if cancel_pending:
+            pending = self.drain()
+            [_task.future.cancel() for _task in pending]
+
+        # queued after the pending tasks, so those run first when kept.
+        [self.task_queue.put((float("inf"), next(self._sequence), _STOP)) for _ in self._threads]
+        if wait:
+            [i.stop() for i in self._threads.values()]
+        self._threads = {}
+        return pending
 
     def _new_labor(self):
-        lname = uuid.uuid4()
-        labor = self._laborcls(self.task_queue, self.result_queue, lname)
+        lname = "_labor-{}".format(uuid.uuid4())
+        if self.is_elastic():
+            labor = self._laborcls(self.task_queue, self._on_result, lname,
+                                   idle_timeout=self.idle_timeout, on_idle=self._retire_labor)
+        else:
+            labor = self._laborcls(self.task_queue, self._on_result, lname)
         labor.daemon = True
         self._threads[lname] = labor
         labor.start()
 
+    def busy_count(self):
+        return len([labor for labor in list(self._threads.values())
+                    if labor.is_executing_task.is_set()])
+
+    def free_capacity(self):
+        """labors which could start a task now, not counting the backlog."""
+        return max(self.max_size - self.busy_count() - self.task_queue.qsize(), 0)
+
+    def stats(self) -> dict:
+        size = len(self._threads)
+        busy = self.busy_count()
+        return {
+            "size": size,
+            "min_size": self.size,
+            "max_size": self.max_size,
+            "busy": busy,
+            "idle": size - busy,
+            "backlog": self.task_queue.qsize(),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
     def is_working(self):
         return self._working
 
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# coding:utf-8
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
+from threading import Lock
+
+from django.db import connections
+
+from .pool import _Task, _Result
+
+# database connections inherited from the parent through fork, kept alive
+# so that they are never closed from the child and break the parent's.
+_inherited_connections = []
+
+
+def _initialize_process(settings_module):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+
+    from django.apps import apps
+    if not apps.ready:
+        # spawned / forkserver child: nothing is configured yet.
+        import django
+        django.setup()
+
+    for connection in connections.all():
+        if connection.connection is not None:
+            _inherited_connections.append(connection.connection)
+            connection.connection = None
+
+
+def _run_in_process(func, args, kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        connections.close_all()
+
+
+class ProcessPool(object):
+    """
+    process backed counterpart of `schedium.pool.Pool` for CPU bound
+    callbacks: same `start` / `execute` / `stop` / `stats` interface and
+    `_Result` reporting. functions and arguments must be picklable.
+
+    each process sets Django up (spawn) or drops the database connections
+    inherited from the parent (fork) and opens its own.
+    """
+
+    def __init__(self, size=None, result_callback=None, mp_context=None):
+        self.size = size or os.cpu_count() or 1
+        self.result_callback = result_callback
+        self.mp_context = mp_context
+
+        self._executor = None
+        self._working = False
+        self._pending = 0
+        self._pending_lock = Lock()
+
+    def start(self):
+        if isinstance(self.mp_context, str):
+            context = multiprocessing.get_context(self.mp_context)
+        else:
+            context = self.mp_context
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.size, mp_context=context,
+            initializer=_initialize_process,
+            initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", ""),),
+        )
+        self._working = True
+
+    def execute(self, func, args=(), kwargs={}, id=None, priority=0) -> Future:
+        # ProcessPoolExecutor has a single FIFO queue, `priority` is ignored.
+        _t = _Task(func, args, kwargs, id)
+        start = time.time()
+        with self._pending_lock:
+            self._pending += 1
+
+        future = self._executor.submit(_run_in_process, func, args, kwargs)
+        future.add_done_callback(lambda done: self._on_done(_t, done, start))
+        return future
+
+    def _on_done(self, _task, future, start):
+        with self._pending_lock:
+            self._pending -= 1
+
+        if not self.result_callback or future.cancelled():
+            return
+
+        exception = future.exception()
+        if exception is None:
+            result = _Result(_task, future.result(), None, None, time.time() - start)
+        else:
+            trackinfo = "".join(traceback.format_exception(
+                type(exception), exception, exception.__traceback__
+            ))
+            result = _Result(_task, None, trackinfo, exception, time.time() - start)
+
+        try:
+            self.result_callback(result)
+        except Exception as e:
+            print('result callback is failed: {}'.format(e))
+
+    def stop(self, cancel_pending=True, wait=True):
+        self._working = False
+        if self._executor:
+            self._executor.shutdown(wait=wait, cancel_futures=cancel_pending)
+        return []
+
+    def is_working(self):
+        return self._working
+
+    def free_capacity(self):
+        return max(self.size - self._pending, 0)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "min_size": self.size,
+            "max_size": self.size,
+            "busy": min(self._pending, self.size),
+            "idle": max(self.size - self._pending, 0),
+            "backlog": max(self._pending - self.size, 0),
+        }
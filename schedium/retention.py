@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# coding:utf-8
+import logging
+import time
+
+from django.db import transaction
+
+from schedium import models
+
+logger = logging.getLogger(__name__)
+
+
+def purge_finished_tasks(older_than, batch_size=1000, pause=0):
+    """
+    delete finished tasks not updated for `older_than` seconds.
+
+    rows are deleted in primary key order, `batch_size` rows per
+    transaction, so the live table is never locked for long.
+    """
+    cutoff = time.time() - older_than
+    last_sched_id = None
+    total = 0
+
+    while True:
+        queryset = models.SchediumTask.objects.filter(
+            is_finished=True, updated_time__lt=cutoff
+        )
+        if last_sched_id is not None:
+            queryset = queryset.filter(sched_id__gt=last_sched_id)
+
+        with transaction.atomic():
+            sched_ids = list(queryset.order_by("sched_id").values_list(
+                "sched_id", flat=True
+            )[:batch_size])
+            if not sched_ids:
+                break
+
+            deleted, _ = models.SchediumTask.objects.filter(
+                sched_id__in=sched_ids, is_finished=True
+            ).delete()
+
+        total += deleted
+        last_sched_id = sched_ids[-1]
+        logger.debug("purged {} finished tasks up to {}".format(deleted, last_sched_id))
+
+        if pause:
+            time.sleep(pause)
+
+    return total
@@ -1,6 +1,20 @@
+import asyncio
+import datetime
+import os
+import random
 import time
-from django.test import TransactionTestCase
-from schedium.core import schediumer
+from collections import namedtuple
+from unittest import mock
+from django.db import DatabaseError
+from django.test import SimpleTestCase, TransactionTestCase
+from schedium import models
+from schedium.aio import AsyncSchedium
+from schedium.core import Schedium, schediumer, start_schediumer
+from schedium.cron import CronExpression
+from schedium.misfire import next_fire_time
+from schedium.pool import Pool
+from schedium.retention import purge_finished_tasks
+from schedium.timerqueue import TimerQueue, TimingWheel
 
 _check = {
     "loop": 0
@@ -42,3 +56,703 @@ class TaskBasicUsecase(TransactionTestCase):
 
     def tearDown(self):
         schediumer.shutdown()
+
+
+class DefaultSchediumUsecase(TransactionTestCase):
+
+    def test_explicit_start(self):
+        schediumer.shutdown()
+        self.assertFalse(schediumer.is_running())
+
+        start_schediumer()
+        tick_thread = schediumer._tick_thread
+        self.assertTrue(schediumer.is_running())
+
+        # starting again keeps the running threads.
+        schediumer.start()
+        self.assertIs(schediumer._tick_thread, tick_thread)
+
+    def tearDown(self):
+        schediumer.shutdown()
+
+
+class GracefulShutdownUsecase(TransactionTestCase):
+
+    def setUp(self):
+        schediumer.shutdown()
+        self.schedium = Schedium(event_driven=True, pool_size=1)
+
+    def test_unstarted_tasks_are_released(self):
+        started = []
+
+        @self.schedium.register_task_callback("drain")
+        def slow(task_id):
+            started.append(task_id)
+            time.sleep(0.5)
+
+        self.schedium.delay_tasks({"task_type": "drain", "task_id": str(index), "delay": 0}
+                                  for index in range(3))
+        while not started:
+            time.sleep(0.05)
+
+        self.assertEqual(self.schedium.shutdown(), 2)
+        self.assertEqual(len(started), 1)
+        self.assertEqual(models.SchediumTask.objects.filter(is_finished=True).count(), 1)
+        self.assertEqual(models.SchediumTask.objects.filter(
+            in_sched=False, lease_owner=None, is_finished=False).count(), 2)
+
+    def test_late_handover_does_not_restart_the_pool(self):
+        self.schedium.register("late", print, max_concurrency=1)
+        self.schedium._running_counts["late"] = 1
+        self.schedium.shutdown()
+
+        # a slot handed over by a labor while the pools are stopped.
+        self.schedium._submit("late", "late", "late")
+        self.assertFalse(self.schedium.pool.is_working())
+        self.assertEqual(self.schedium._cancelled, ["late"])
+        self.assertEqual(self.schedium._running_counts, {"late": 0})
+
+
+class EventDrivenUsecase(TransactionTestCase):
+    timer = "heap"
+
+    def setUp(self):
+        schediumer.shutdown()
+        self.schedium = Schedium(event_driven=True, timer=self.timer)
+
+    def test_sub_second_delay(self):
+        fired = []
+        self.schedium.register("subsecond", lambda task_id: fired.append(time.time()))
+
+        start = time.time()
+        self.schedium.delay_task(task_type="subsecond", task_id="fast", delay=0.3)
+
+        time.sleep(0.8)
+        self.assertEqual(len(fired), 1)
+        self.assertLess(fired[0] - start, 0.7)
+
+    def tearDown(self):
+        self.schedium.shutdown()
+
+
+class TimingWheelUsecase(EventDrivenUsecase):
+    timer = "wheel"
+
+
+class NotifyUsecase(TransactionTestCase):
+
+    def setUp(self):
+        schediumer.shutdown()
+        # without a wakeup the node would only sync again after 50s.
+        self.node = Schedium(event_driven=True, tick_interval=5, notify=True,
+                             notify_poll_interval=0.1)
+        self.creator = Schedium(autostart=False, notify=True)
+
+    def test_other_instance_wakes_the_node(self):
+        fired = []
+        self.node.register("notified", lambda task_id: fired.append(time.time()))
+        time.sleep(0.5)
+
+        start = time.time()
+        self.creator.delay_task(task_type="notified", task_id="soon", delay=0.2)
+        while not fired and time.time() - start < 3:
+            time.sleep(0.05)
+
+        self.assertEqual(len(fired), 1)
+        self.assertLess(fired[0] - start, 1)
+
+    def tearDown(self):
+        self.node.shutdown()
+
+
+class LeaseClaimUsecase(TransactionTestCase):
+
+    def setUp(self):
+        schediumer.shutdown()
+        self.nodes = [Schedium(), Schedium()]
+        for node in self.nodes:
+            node.shutdown()
+
+    def test_claims_are_disjoint_until_lease_expires(self):
+        node_a, node_b = self.nodes
+        for index in range(3):
+            node_a.delay_task(task_type="lease", task_id=str(index), delay=0)
+
+        claimed_a = {task.sched_id for task in node_a.safe_fetch_tasks(limit=2)}
+        claimed_b = {task.sched_id for task in node_b.safe_fetch_tasks()}
+        self.assertEqual(len(claimed_a), 2)
+        self.assertEqual(len(claimed_b), 1)
+        self.assertFalse(claimed_a & claimed_b)
+        self.assertEqual(node_b.safe_fetch_tasks(), [])
+
+        models.SchediumTask.objects.filter(lease_owner=node_a._id).update(lease_expire=0)
+        reclaimed = {task.sched_id for task in node_b.safe_fetch_tasks()}
+        self.assertEqual(reclaimed, claimed_a)
+
+    def test_unregistered_task_type_is_released(self):
+        node_a = self.nodes[0]
+        node_a.delay_task(task_type="nobody", task_id="orphan", delay=0, sched_id="orphan")
+        node_a.sync_database(full=True)
+
+        node_a.execute_task("nobody", "orphan", "orphan")
+        task = models.SchediumTask.objects.get(sched_id="orphan")
+        self.assertFalse(task.in_sched)
+        self.assertIsNone(task.lease_owner)
+
+    def test_backpressure_limits_claims(self):
+        node = Schedium(pool_size=2, max_backlog=1, autostart=False)
+        node.delay_tasks({"task_type": "lease", "task_id": str(index), "delay": 0}
+                         for index in range(5))
+
+        self.assertEqual(len(node.sync_database(full=True)), 3)
+        self.assertEqual(node.sync_database(), [])
+        self.assertEqual(models.SchediumTask.objects.filter(in_sched=False).count(), 2)
+
+
+class DeltaSyncUsecase(TransactionTestCase):
+
+    def setUp(self):
+        schediumer.shutdown()
+        # a 1s lookahead window, and no full sync during the test.
+        self.node = Schedium(tick_interval=0.1, full_sync_interval=60, autostart=False)
+
+    def delay(self, sched_id, delay):
+        self.node.delay_task(task_type="delta", task_id=sched_id, delay=delay, sched_id=sched_id)
+
+    def synced(self):
+        return [task.sched_id for task in self.node.sync_database()]
+
+    def test_delta_sync_claims_new_and_entering_rows(self):
+        self.delay("due", 0)
+        self.delay("later", 1.5)
+        self.assertEqual([task.sched_id for task in self.node.sync_database(full=True)], ["due"])
+        # not a changed row any more, only the horizon brings it in.
+        models.SchediumTask.objects.filter(sched_id="later").update(updated_time=0)
+
+        self.delay("new", 0)
+        self.assertEqual(self.synced(), ["new"])
+
+        time.sleep(0.7)
+        self.assertEqual(self.synced(), ["later"])
+        self.assertEqual(self.synced(), [])
+
+        self.assertEqual(sorted(self.node._tasks.sched_ids()), ["due", "later", "new"])
+        self.assertEqual(models.SchediumTask.objects.filter(
+            lease_owner=self.node._id, in_sched=True).count(), 3)
+
+
+class CompletionBatchUsecase(TransactionTestCase):
+
+    def setUp(self):
+        schediumer.shutdown()
+        self.node = Schedium(completion_batch_size=3, completion_flush_interval=0.3,
+                             autostart=False)
+        self.node.delay_tasks({"task_type": "batch", "task_id": str(index),
+                               "sched_id": str(index), "delay": 0} for index in range(6))
+        self.node.sync_database(full=True)
+        # popped as if dispatched.
+        list(self.node.fetch_closed_tasks())
+
+    def assertFinished(self, sched_ids):
+        self.assertEqual(sorted(models.SchediumTask.objects.filter(
+            is_finished=True, in_sched=False, lease_owner=None
+        ).values_list("sched_id", flat=True)), sched_ids)
+
+    def test_flush_on_batch_size(self):
+        self.node._complete_task("0")
+        self.node._complete_task("1")
+        # buffered, the rows stay claimed until the flush.
+        self.assertFinished([])
+        self.assertEqual(models.SchediumTask.objects.filter(lease_owner=self.node._id).count(), 6)
+
+        self.node._complete_task("2")
+        self.assertFinished(["0", "1", "2"])
+        self.assertEqual(self.node._completions, {})
+
+    def test_flush_on_interval_and_shutdown(self):
+        self.node._complete_task("0")
+        time.sleep(0.4)
+        self.node._maintain()
+        self.assertFinished(["0"])
+
+        self.node._complete_task("1")
+        self.assertEqual(self.node.shutdown(), 0)
+        self.assertFinished(["0", "1"])
+
+
+class TaskControlUsecase(TransactionTestCase):
+
+    def setUp(self):
+        schediumer.shutdown()
+        self.node = Schedium(autostart=False)
+        self.other = Schedium(autostart=False)
+
+    def claim(self, sched_ids):
+        self.node.delay_tasks({"task_type": "control", "task_id": sched_id,
+                               "sched_id": sched_id, "delay": 0} for sched_id in sched_ids)
+        self.node.sync_database(full=True)
+
+    def test_cancel_and_reschedule_in_memory_tasks(self):
+        self.claim(["a", "b", "c"])
+
+        self.assertEqual(self.node.cancel_tasks(["a", "b"]), 2)
+        self.assertNotIn("a", self.node._tasks)
+        self.assertEqual(models.SchediumTask.objects.filter(is_finished=True).count(), 2)
+        # a cancelled task is not written back by a completion.
+        self.node._completions["a"] = time.time()
+        self.node.flush_completions()
+        self.assertIsNone(models.SchediumTask.objects.get(sched_id="a").last_executed_time)
+
+        later = time.time() + 5
+        self.assertTrue(self.node.reschedule_task("c", later))
+        self.node.sync_database()
+        self.assertEqual(self.node._tasks.get("c").next_time, later)
+
+    def test_claim_right_after_the_update_is_kept(self):
+        self.claim(["a"])
+
+        # the tick syncs between the UPDATE and the end of reschedule_task.
+        self.node.notify = True
+        with mock.patch("schedium.core.send_notify", side_effect=self.node.sync_database):
+            self.assertTrue(self.node.reschedule_task("a", time.time()))
+
+        self.assertIn("a", self.node._tasks)
+        self.assertEqual(models.SchediumTask.objects.get(sched_id="a").lease_owner, self.node._id)
+
+    def test_reconcile_with_more_changed_rows_than_memory(self):
+        self.claim(["a", "b"])
+        self.other.cancel_task("a")
+        # changed rows of other instances, due within the window.
+        self.other.delay_tasks({"task_type": "elsewhere", "task_id": str(index), "delay": 0}
+                               for index in range(3))
+
+        self.node._reconcile(changed_since=time.time() - 5)
+        self.assertEqual(self.node._tasks.sched_ids(), ["b"])
+
+    def test_queued_tasks_do_not_run(self):
+        node = Schedium(pool_size=1, autostart=False)
+        ran = []
+
+        @node.register_task_callback("queued")
+        def slow(task_id):
+            ran.append(task_id)
+            time.sleep(0.3)
+
+        for sched_id in ("first", "second", "third"):
+            node.delay_task(task_type="queued", task_id=sched_id, delay=0, sched_id=sched_id)
+        node.sync_database(full=True)
+        for task in list(node.fetch_closed_tasks()):
+            node._dispatch(*task)
+        while not ran:
+            time.sleep(0.05)
+
+        # "second" and "third" are waiting in the pool behind "first".
+        self.assertTrue(node.cancel_task("second"))
+        self.assertTrue(node.reschedule_task("third", time.time()))
+        node.sync_database()
+        for task in list(node.fetch_closed_tasks()):
+            node._dispatch(*task)
+        node.pool.stop(cancel_pending=False)
+
+        self.assertEqual(ran, ["first", "third"])
+
+    def test_pause_from_another_instance(self):
+        self.claim(["a", "b"])
+
+        self.assertEqual(self.other.pause_tasks(["a"]), 1)
+        # the delta sync drops what another process took away.
+        self.node.sync_database()
+        self.assertEqual(self.node._tasks.sched_ids(), ["b"])
+        self.assertEqual(self.node.safe_fetch_tasks(), [])
+
+        self.assertTrue(self.other.resume_task("a"))
+        self.assertFalse(self.other.resume_task("a"))
+        self.node.sync_database()
+        self.assertEqual(sorted(self.node._tasks.sched_ids()), ["a", "b"])
+
+
+class BulkCreateUsecase(TransactionTestCase):
+
+    def setUp(self):
+        schediumer.shutdown()
+
+    def test_delay_and_loop_tasks(self):
+        sched_ids = schediumer.delay_tasks(
+            ({"task_type": "bulk", "task_id": str(index), "delay": 3600} for index in range(25)),
+            batch_size=10
+        )
+        sched_ids += schediumer.loop_tasks(
+            [{"task_type": "bulk", "task_id": "loop", "loop_interval": 60, "first": False}]
+        )
+
+        self.assertEqual(len(set(sched_ids)), 26)
+        self.assertEqual(models.SchediumTask.objects.filter(sched_id__in=sched_ids).count(), 26)
+        self.assertEqual(models.SchediumTask.objects.filter(interval=60).count(), 1)
+
+    def test_invalid_spec_creates_nothing(self):
+        with self.assertRaises(ValueError):
+            schediumer.loop_tasks([
+                {"task_type": "bulk", "task_id": "ok", "loop_interval": 60},
+                {"task_type": "bulk", "task_id": "bad", "loop_interval": 60,
+                 "loop_start": time.time(), "loop_end": time.time() - 60},
+            ])
+        self.assertFalse(models.SchediumTask.objects.exists())
+
+
+def _process_pid(task_id):
+    return os.getpid()
+
+
+class ProcessExecutorUsecase(TransactionTestCase):
+
+    def setUp(self):
+        schediumer.shutdown()
+        self.results = []
+        self.schedium = Schedium(event_driven=True, process_pool_size=1,
+                                 result_callback=self.results.append)
+
+    def test_callback_runs_in_process(self):
+        self.schedium.register("cpu", _process_pid, executor="process")
+        task = self.schedium.delay_task(task_type="cpu", task_id="pid", delay=0)
+
+        deadline = time.time() + 10
+        while not self.results and time.time() < deadline:
+            time.sleep(0.1)
+
+        self.assertEqual(len(self.results), 1)
+        self.assertTrue(self.results[0].succeeded)
+        self.assertNotEqual(self.results[0].result, os.getpid())
+
+        while time.time() < deadline:
+            self.schedium.flush_completions()
+            if models.SchediumTask.objects.get(sched_id=task.sched_id).is_finished:
+                break
+            time.sleep(0.1)
+        self.assertTrue(models.SchediumTask.objects.get(sched_id=task.sched_id).is_finished)
+
+    def tearDown(self):
+        self.schedium.shutdown()
+
+
+class AsyncSchediumUsecase(TransactionTestCase):
+
+    def setUp(self):
+        schediumer.shutdown()
+        self.schedium = AsyncSchedium(max_in_flight=100)
+
+    def test_coroutine_callbacks_run_concurrently(self):
+        fired = []
+
+        @self.schedium.register_task_callback("webhook")
+        async def webhook(task_id):
+            await asyncio.sleep(1)
+            fired.append(task_id)
+
+        self.schedium.delay_tasks(
+            {"task_type": "webhook", "task_id": str(index), "delay": 0} for index in range(50)
+        )
+
+        # 50 one-second callbacks on a single loop, far beyond the pool size.
+        time.sleep(2.5)
+        self.assertEqual(len(fired), 50)
+
+    def tearDown(self):
+        self.schedium.shutdown()
+
+
+class DispatchOptionsUsecase(TransactionTestCase):
+
+    def setUp(self):
+        schediumer.shutdown()
+        self.schedium = Schedium(event_driven=True, pool_size=4, lanes={"critical": 1})
+
+    def test_concurrency_limit_and_lane(self):
+        running = []
+        peak = []
+        fired = {}
+
+        @self.schedium.register_task_callback("slow", max_concurrency=1)
+        def slow(task_id):
+            running.append(task_id)
+            peak.append(len(running))
+            time.sleep(0.3)
+            running.remove(task_id)
+            fired[task_id] = time.time()
+
+        @self.schedium.register_task_callback("urgent", executor="critical", priority=10)
+        def urgent(task_id):
+            fired[task_id] = time.time()
+
+        start = time.time()
+        self.schedium.delay_tasks({"task_type": "slow", "task_id": "slow-{}".format(index), "delay": 0}
+                                  for index in range(3))
+        self.schedium.delay_task(task_type="urgent", task_id="urgent", delay=0)
+
+        while len(fired) < 4 and time.time() - start < 5:
+            time.sleep(0.05)
+        self.assertEqual(len(fired), 4)
+        self.assertEqual(max(peak), 1)
+        self.assertLess(fired["urgent"] - start, 0.3)
+
+    def test_failed_flush_releases_the_slot(self):
+        node = Schedium(completion_batch_size=1, autostart=False)
+        ran = []
+        node.register("limited", ran.append, max_concurrency=1)
+
+        with mock.patch.object(node, "safe_handle_executed_tasks", side_effect=DatabaseError):
+            start = time.time()
+            node._dispatch("limited", "first", "first")
+            node._dispatch("limited", "second", "second")
+            while len(ran) < 2 and time.time() - start < 3:
+                time.sleep(0.05)
+            node.pool.stop(cancel_pending=False)
+
+        self.assertEqual(ran, ["first", "second"])
+        self.assertEqual(node._running_counts, {"limited": 0})
+        self.assertEqual(sorted(node._completions), ["first", "second"])
+
+    def test_unknown_executor(self):
+        with self.assertRaises(ValueError):
+            self.schedium.register("nowhere", print, executor="nowhere")
+
+    def tearDown(self):
+        self.schedium.shutdown()
+
+
+class MetricsUsecase(TransactionTestCase):
+
+    def setUp(self):
+        schediumer.shutdown()
+        self.schedium = Schedium(event_driven=True, metrics=True)
+
+    def test_execution_is_instrumented(self):
+        self.schedium.register("measured", lambda task_id: None)
+        self.schedium.delay_task(task_type="measured", task_id="1", delay=0)
+        time.sleep(0.5)
+
+        counters = self.schedium.stats()["metrics"]["counters"]
+        self.assertIn({"name": "executions_total", "value": 1,
+                       "labels": {"task_type": "measured", "outcome": "success"}}, counters)
+
+        text = self.schedium.render_prometheus()
+        self.assertIn("schedium_fire_lag_seconds_count 1", text)
+        self.assertIn('schedium_executor_size{executor="thread"} 5', text)
+
+    def test_metrics_view(self):
+        response = self.client.get("/schedium/metrics/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"schedium_tasks_in_memory", response.content)
+
+    def tearDown(self):
+        self.schedium.shutdown()
+
+
+class RetentionUsecase(TransactionTestCase):
+
+    def test_purge_finished_tasks(self):
+        now = time.time()
+        for index in range(5):
+            models.SchediumTask.objects.create(
+                sched_id="old-{}".format(index), task_id=str(index), start_time=now,
+                next_time=now, is_finished=True, updated_time=now - 3600,
+            )
+        models.SchediumTask.objects.create(
+            sched_id="recent", task_id="recent", start_time=now, next_time=now,
+            is_finished=True, updated_time=now,
+        )
+        models.SchediumTask.objects.create(
+            sched_id="pending", task_id="pending", start_time=now, next_time=now + 3600,
+            updated_time=now - 3600,
+        )
+
+        self.assertEqual(purge_finished_tasks(60, batch_size=2), 5)
+        self.assertEqual(
+            set(models.SchediumTask.objects.values_list("sched_id", flat=True)),
+            {"recent", "pending"}
+        )
+
+
+class CronTaskUsecase(TransactionTestCase):
+
+    def setUp(self):
+        schediumer.shutdown()
+        self.schedium = Schedium(autostart=False)
+
+    def test_cron_task_is_rescheduled(self):
+        task = self.schedium.cron_task("cron", "weekdays", "0 9 * * mon-fri")
+        sched_id = task.sched_id
+        self.assertEqual(datetime.datetime.fromtimestamp(task.next_time, datetime.timezone.utc).hour, 9)
+
+        # fire it now, the completion moves it to the following match.
+        models.SchediumTask.objects.filter(sched_id=sched_id).update(next_time=time.time() - 1)
+        self.assertEqual(len(self.schedium.safe_fetch_tasks()), 1)
+        executed = time.time()
+        self.schedium.safe_handle_executed_tasks({sched_id: executed})
+
+        task.refresh_from_db()
+        self.assertFalse(task.is_finished)
+        self.assertFalse(task.in_sched)
+        self.assertEqual(task.next_time, CronExpression("0 9 * * 1-5").next_after(executed))
+
+    def test_invalid_expression(self):
+        with self.assertRaises(ValueError):
+            self.schedium.cron_task("cron", "invalid", "0 25 * * *")
+        self.assertFalse(models.SchediumTask.objects.exists())
+
+    def tearDown(self):
+        self.schedium.shutdown()
+
+
+class CronTestCase(SimpleTestCase):
+
+    def next_times(self, expression, start, count=3):
+        cron = CronExpression(expression, datetime.timezone.utc)
+        moment = start.timestamp()
+        times = []
+        for _ in range(count):
+            moment = cron.next_after(moment)
+            times.append(datetime.datetime.fromtimestamp(moment, datetime.timezone.utc))
+        return times
+
+    def test_fields(self):
+        # friday 2026-10-16 09:00 UTC
+        start = datetime.datetime(2026, 10, 16, 9, 0, tzinfo=datetime.timezone.utc)
+
+        self.assertEqual([t.day for t in self.next_times("0 9 * * mon-fri", start)], [19, 20, 21])
+        self.assertEqual([t.minute for t in self.next_times("*/20 * * * *", start)], [20, 40, 0])
+        self.assertEqual([t.year for t in self.next_times("0 0 29 2 *", start)], [2028, 2032, 2036])
+        self.assertEqual([t.day for t in self.next_times("@weekly", start)], [18, 25, 1])
+        self.assertEqual([t.month for t in self.next_times("0 0 1 jan,JUL *", start)], [1, 7, 1])
+        # day of month or day of week
+        self.assertEqual([t.day for t in self.next_times("0 0 1 * 0", start)], [18, 25, 1])
+
+    def test_invalid(self):
+        for expression in ("* * *", "60 * * * *", "0 0 * * 8", "5-1 * * * *", "*/0 * * * *"):
+            with self.assertRaises(ValueError):
+                CronExpression(expression)
+        with self.assertRaises(ValueError):
+            CronExpression("0 0 30 2 *").next_after(time.time())
+
+
+class MisfireTestCase(SimpleTestCase):
+
+    def test_policies(self):
+        # due at 0, executed at 10.5: the runs due at 1..10 were missed.
+        self.assertEqual(next_fire_time(0, 1, 10.5, "skip"), 11)
+        self.assertEqual(next_fire_time(0, 1, 10.5, "run_once"), 10)
+        self.assertEqual(next_fire_time(0, 1, 10.5, "coalesce"), 10)
+        self.assertEqual(next_fire_time(0, 1, 10.5, "run_all"), 1)
+        self.assertEqual(next_fire_time(0, 1, 10.5, "run_all", 3), 8)
+        # on time: nothing missed whatever the policy.
+        self.assertEqual(next_fire_time(0, 1, 0.5, "run_once"), 1)
+
+    def test_run_all_is_capped_until_caught_up(self):
+        next_time, runs = 0, 0
+        while next_time < 10.5:
+            next_time = next_fire_time(next_time, 1, 10.5 + runs * 0.01, "run_all", 3)
+            runs += 1
+        self.assertEqual((next_time, runs), (11, 4))
+
+    def test_long_downtime(self):
+        week = 7 * 24 * 3600
+        self.assertEqual(next_fire_time(0, 1, week + 0.5, "skip"), week + 1)
+
+
+_Entry = namedtuple("_Entry", ["sched_id", "next_time"])
+
+
+def _echo(a, b, c):
+    return a, b, c
+
+
+class PoolTestCase(SimpleTestCase):
+
+    def test_bounded_results(self):
+        outcomes = []
+        pool = Pool(size=2, result_callback=outcomes.append, result_queue_size=3)
+        pool.start()
+        for i in range(10):
+            pool.execute(_echo, (i, 2), {"c": "123123123"})
+        pool.execute(int, ("not a number",))
+        while len(outcomes) < 11:
+            time.sleep(0.1)
+        pool.stop()
+
+        self.assertEqual(pool.result_queue.qsize(), 3)
+        self.assertEqual(len([r for r in outcomes if not r.succeeded]), 1)
+        self.assertTrue(all(r.duration is not None for r in outcomes))
+
+    def test_executor(self):
+        with Pool(size=4) as pool:
+            pool.start()
+            self.assertEqual(list(pool.map(pow, range(5), [2] * 5)), [0, 1, 4, 9, 16])
+            futures = pool.execute_many([(pow, (2, i), {}) for i in range(3)])
+            self.assertEqual([f.result(timeout=1) for f in futures], [1, 2, 4])
+            self.assertRaises(ValueError, pool.submit(int, "not a number").result, 1)
+
+    def test_priority(self):
+        pool = Pool(size=1)
+        order = []
+        pool.execute(time.sleep, (0.2,))
+        [pool.execute(order.append, (i,), priority=i) for i in (1, 3, 2)]
+        pool.start()
+        pool.stop(cancel_pending=False)
+        self.assertEqual(order, [3, 2, 1])
+
+    def test_elastic(self):
+        pool = Pool(size=1, max_size=4, idle_timeout=0.2)
+        pool.start()
+        futures = [pool.submit(time.sleep, 0.3) for _ in range(4)]
+        self.assertEqual(pool.stats()["size"], 4)
+        [future.result() for future in futures]
+
+        time.sleep(0.6)
+        self.assertEqual(pool.stats()["size"], 1)
+        self.assertEqual(pool.stats()["backlog"], 0)
+        pool.stop()
+
+
+class TimerQueueTestCase(SimpleTestCase):
+
+    def test_pop_due_in_order(self):
+        queue = TimerQueue([_Entry("c", 30), _Entry("a", 10), _Entry("b", 20)])
+
+        self.assertEqual(queue.peek_time(), 10)
+        self.assertEqual([task.sched_id for task in queue.pop_due(20)], ["a", "b"])
+        self.assertEqual(len(queue), 1)
+        self.assertEqual(queue.peek_time(), 30)
+
+    def test_lazy_remove_and_replace(self):
+        queue = TimerQueue([_Entry("a", 10), _Entry("b", 20)])
+
+        queue.remove("a")
+        queue.push(_Entry("b", 5))
+
+        self.assertNotIn("a", queue)
+        self.assertEqual([task.next_time for task in queue.pop_due(100)], [5])
+        self.assertIsNone(queue.peek_time())
+
+
+class TimingWheelTestCase(SimpleTestCase):
+
+    def test_same_order_as_heap(self):
+        rnd = random.Random(0)
+        now = time.time()
+        # small wheels, so that tasks cascade and overflow.
+        wheel, heap = TimingWheel(resolution=0.5, slots=8, levels=2), TimerQueue()
+
+        for _ in range(2000):
+            operation = rnd.random()
+            if operation < 0.5:
+                task = _Entry(str(rnd.randrange(100)), now + rnd.choice([-1, 10, 1000]) * rnd.random())
+                wheel.push(task)
+                heap.push(task)
+            elif operation < 0.6:
+                sched_id = str(rnd.randrange(100))
+                self.assertEqual(wheel.remove(sched_id), heap.remove(sched_id))
+            else:
+                now += rnd.choice([0.1, 5, 500])
+                self.assertEqual(wheel.peek_time(), heap.peek_time())
+                self.assertEqual([task.next_time for task in wheel.pop_due(now)],
+                                 [task.next_time for task in heap.pop_due(now)])
+            self.assertEqual(len(wheel), len(heap))
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# coding:utf-8
+import heapq
+import itertools
+import time
+
+
+class TimerQueue(object):
+    """
+    min-heap of in-memory tasks ordered by `next_time`.
+
+    entries are indexed by `sched_id`; removing or replacing a task only
+    drops it from the index, the stale heap entry is skipped when it
+    reaches the top (lazy deletion).
+    """
+
+    def __init__(self, tasks=()):
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+
+        for task in tasks:
+            self.push(task)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, sched_id):
+        return sched_id in self._entries
+
+    def __iter__(self):
+        return (entry[3] for entry in self._entries.values())
+
+    def sched_ids(self):
+        return list(self._entries.keys())
+
+    def get(self, sched_id):
+        entry = self._entries.get(sched_id)
+        return entry[3] if entry else None
+
+    def push(self, task):
+        entry = [task.next_time, next(self._counter), task.sched_id, task]
+        self._entries[task.sched_id] = entry
+        heapq.heappush(self._heap, entry)
+
+        # the heap only ever holds a constant factor of stale entries.
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._compact()
+
+    def remove(self, sched_id):
+        entry = self._entries.pop(sched_id, None)
+        return entry[3] if entry else None
+
+    def peek_time(self):
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        while True:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                return
+
+            entry = heapq.heappop(self._heap)
+            # removed from another thread since the check.
+            if self._entries.pop(entry[2], None) is entry:
+                yield entry[3]
+
+    def clear(self):
+        self._heap = []
+        self._entries = {}
+
+    def _is_stale(self, entry):
+        return self._entries.get(entry[2]) is not entry
+
+    def _drop_stale(self):
+        while self._heap and self._is_stale(self._heap[0]):
+            heapq.heappop(self._heap)
+
+    def _compact(self):
+        self._heap = list(self._entries.values())
+        heapq.heapify(self._heap)
+
+
+class TimingWheel(object):
+    """
+    hierarchical timing wheel with the interface of `TimerQueue`, for very
+    large numbers of near-term tasks: push and remove are O(1) and
+    `pop_due` expires whole buckets as the tick moves forward.
+
+    time is cut into ticks of `resolution` seconds. level 0 has one bucket
+    per tick, every upper level buckets `slots` times longer spans and is
+    cascaded down when the tick reaches them; tasks beyond the last level
+    wait in an overflow list. removed or replaced tasks are dropped lazily
+    like in `TimerQueue`.
+    """
+
+    def __init__(self, tasks=(), resolution=0.1, slots=256, levels=4):
+        if slots & (slots - 1):
+            raise ValueError("slots should be a power of 2")
+
+        self.resolution = resolution
+        self.slots = slots
+        self.levels = levels
+        self._bits = slots.bit_length() - 1
+        self._mask = slots - 1
+        self.clear()
+
+        for task in tasks:
+            self.push(task)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, sched_id):
+        return sched_id in self._entries
+
+    def __iter__(self):
+        return (entry[2] for entry in self._entries.values())
+
+    def sched_ids(self):
+        return list(self._entries.keys())
+
+    def get(self, sched_id):
+        entry = self._entries.get(sched_id)
+        return entry[2] if entry else None
+
+    def push(self, task):
+        entry = [task.next_time, task.sched_id, task]
+        self._entries[task.sched_id] = entry
+        self._place(entry)
+
+    def remove(self, sched_id):
+        entry = self._entries.pop(sched_id, None)
+        return entry[2] if entry else None
+
+    def clear(self):
+        self._wheels = [[[] for _ in range(self.slots)] for _ in range(self.levels)]
+        # placed entries per level, stale ones included until dropped.
+        self._counts = [0] * self.levels
+        self._overflow = []
+        self._entries = {}
+        self._current = int(time.time() // self.resolution)
+
+    def peek_time(self):
+        # the first bucket holding live tasks, from the current tick on,
+        # holds the earliest ones.
+        for level in range(self.levels):
+            if not self._counts[level]:
+                continue
+            shift = self._bits * level
+            start = (self._current >> shift) & self._mask
+            for index in range(start if level == 0 else start + 1, self.slots):
+                bucket = self._wheels[level][index]
+                if bucket and self._prune(level, bucket):
+                    return min(entry[0] for entry in bucket)
+
+        live = [entry for entry in self._overflow if not self._is_stale(entry)]
+        self._overflow = live
+        return min(entry[0] for entry in live) if live else None
+
+    def pop_due(self, now):
+        target = int(now // self.resolution)
+        while True:
+            bucket = self._wheels[0][self._current & self._mask]
+            if bucket:
+                due = [entry for entry in bucket if entry[0] <= now]
+                if due:
+                    bucket[:] = [entry for entry in bucket if entry[0] > now]
+                    self._counts[0] -= len(due)
+                    for entry in sorted(due, key=lambda entry: entry[0]):
+                        # also skips tasks removed while iterating.
+                        if not self._is_stale(entry) and \
+                                self._entries.pop(entry[1], None) is entry:
+                            yield entry[2]
+
+            if self._current >= target:
+                return
+            self._advance(target)
+
+    def _place(self, entry):
+        tick = int(entry[0] // self.resolution)
+        if tick < self._current:
+            tick = self._current
+        # the first level whose span around the current tick holds it: the
+        # highest bit where the tick differs from the current one.
+        level = (tick ^ self._current).bit_length() - 1
+        level = level // self._bits if level > 0 else 0
+        if level >= self.levels:
+            self._overflow.append(entry)
+            return
+        self._wheels[level][(tick >> (self._bits * level)) & self._mask].append(entry)
+        self._counts[level] += 1
+
+    def _advance(self, target):
+        # jump to the next non empty tick of level 0, or to the next boundary
+        # of the lowest non empty level: nothing is due in between.
+        level = 0
+        while level < self.levels and not self._counts[level]:
+            level += 1
+        shift = self._bits * level
+        step = ((self._current >> shift) + 1) << shift
+        if level == 0:
+            # the next non empty bucket, else the end of the level 0 span.
+            wheel = self._wheels[0]
+            for index in range((self._current & self._mask) + 1, self.slots):
+                if wheel[index]:
+                    step = self._current - (self._current & self._mask) + index
+                    break
+            else:
+                step = ((self._current >> self._bits) + 1) << self._bits
+        elif level == self.levels:
+            # only the overflow is left: jump to the span of its first task.
+            live = [entry for entry in self._overflow if not self._is_stale(entry)]
+            self._overflow = live
+            if not live:
+                self._current = target
+                return
+            first = int(min(entry[0] for entry in live) // self.resolution)
+            step = max(step, first >> shift << shift)
+        if step > target:
+            self._current = target
+            return
+        self._current = step
+
+        # at a boundary of a level its next bucket is spread to the lower ones.
+        if not step & ((1 << (self._bits * self.levels)) - 1):
+            overflow, self._overflow = self._overflow, []
+            [self._place(entry) for entry in overflow if not self._is_stale(entry)]
+        for level in range(self.levels - 1, 0, -1):
+            if step & ((1 << (self._bits * level)) - 1):
+                continue
+            bucket = self._wheels[level][(step >> (self._bits * level)) & self._mask]
+            self._wheels[level][(step >> (self._bits * level)) & self._mask] = []
+            self._counts[level] -= len(bucket)
+            [self._place(entry) for entry in bucket if not self._is_stale(entry)]
+
+    def _prune(self, level, bucket):
+        live = [entry for entry in bucket if not self._is_stale(entry)]
+        self._counts[level] -= len(bucket) - len(live)
+        bucket[:] = live
+        return live
+
+    def _is_stale(self, entry):
+        return self._entries.get(entry[1]) is not entry
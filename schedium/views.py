@@ -1,3 +1,12 @@
-from django.shortcuts import render
+from django.http import HttpResponse
+
+from .core import schediumer
+
 
 # Create your views here.
+def metrics(request):
+    """Prometheus text exposition of the default scheduler."""
+    return HttpResponse(
+        schediumer.render_prometheus(),
+        content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
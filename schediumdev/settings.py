@@ -126,3 +126,7 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/2.1/howto/static-files/
 
 STATIC_URL = '/static/'
+
+# run the tasks with `manage.py runschedium`, or set SCHEDIUM_AUTOSTART
+# to run them in the web process.
+SCHEDIUM_TASK_MODULES = ["demo.views"]